@@ -1 +1,126 @@
 # API module for Material Requisition System
+import json
+import time
+
+import frappe
+from frappe import _
+from werkzeug.wrappers import Response
+
+from material_requisition import instrumentation
+from material_requisition.query_stats import QueryRecorder
+
+# Upper bound on calls per batch request
+MAX_BATCH_CALLS = 20
+
+BATCH_METHOD = "material_requisition.api.batch"
+
+# Whitelisted methods that commit internally, so their work cannot be rolled back
+# to the batch call's savepoint
+UNBATCHABLE_METHODS = {
+    "material_requisition.api.material_request.create_material_requests_bulk",
+}
+
+@frappe.whitelist(methods=["POST"])
+def batch(calls):
+    """Run several of the app's API calls in one request
+
+    ``calls`` is a list of ``{"method": "material_requisition.api...", "args": {...}}``.
+    Calls run in order in the same request, so they share the session, the
+    request-level caches and one round trip. Each call is checked like a normal
+    API call (it must be a whitelisted method of this app, and the document
+    permission checks inside it still apply) and runs inside its own savepoint, so
+    a failing call is rolled back and reported without stopping the others.
+    Idempotent endpoints take their key from the call's own ``idempotency_key``
+    argument; a key sent with the batch request itself is not passed on.
+
+    Returns one ``{"status", "message"}`` or ``{"status", "error", "exc_type"}``
+    result per call, in order.
+    """
+
+    if isinstance(calls, str):
+        calls = json.loads(calls)
+
+    if not isinstance(calls, list) or not calls:
+        frappe.throw(_("No calls to run"))
+
+    if len(calls) > MAX_BATCH_CALLS:
+        frappe.throw(_("A batch can run at most {0} calls").format(MAX_BATCH_CALLS))
+
+    results = []
+    for index, call in enumerate(calls):
+        method = (call or {}).get("method")
+        args = (call or {}).get("args") or {}
+        if isinstance(args, str):
+            args = json.loads(args)
+
+        args = dict(args)
+        idempotency_key = args.pop("idempotency_key", None)
+
+        savepoint = f"batch_call_{index}"
+        frappe.db.savepoint(savepoint)
+        message_count = len(frappe.local.message_log)
+        start = time.perf_counter()
+
+        try:
+            fn = get_batch_method(method)
+            frappe.flags.promep_idempotency_key = idempotency_key
+            with QueryRecorder(keep_queries=True) as recorder:
+                result = frappe.call(fn, **args)
+
+            if isinstance(result, Response):
+                frappe.throw(_("{0} returns a raw response and cannot be batched").format(method))
+
+            results.append({"method": method, "status": "success", "message": result})
+
+            if instrumentation.is_enabled():
+                instrumentation.record_call(
+                    method,
+                    wall_time=time.perf_counter() - start,
+                    recorder=recorder,
+                    payload_size=len(frappe.as_json(result).encode())
+                )
+
+        except Exception as e:
+            error = str(e)
+            try:
+                frappe.db.rollback(save_point=savepoint)
+            except Exception:
+                # The call committed, which released its savepoint; only the work
+                # after its last commit can still be rolled back
+                frappe.db.rollback()
+                error = _("{0} (the call committed part of its work before failing)").format(error)
+
+            # Keep the messages of failed calls out of the batch response
+            del frappe.local.message_log[message_count:]
+            results.append({
+                "method": method,
+                "status": "error",
+                "error": error,
+                "exc_type": type(e).__name__,
+                "http_status_code": getattr(e, "http_status_code", 500)
+            })
+
+        finally:
+            frappe.flags.pop("promep_idempotency_key", None)
+
+    return results
+
+def get_batch_method(method):
+    """Resolve a batched method, allowing only this app's whitelisted functions"""
+
+    if (
+        not isinstance(method, str)
+        or not method.startswith("material_requisition.")
+        or method == BATCH_METHOD
+        or method in UNBATCHABLE_METHODS
+    ):
+        frappe.throw(_("Method {0} cannot be called in a batch").format(method), frappe.PermissionError)
+
+    try:
+        fn = frappe.get_attr(method)
+    except (ImportError, AttributeError):
+        frappe.throw(_("Method {0} not found").format(method), frappe.DoesNotExistError)
+
+    # Raises PermissionError for methods that are not whitelisted, or not for guests
+    frappe.is_whitelisted(fn)
+    return fn
@@ -1,31 +1,29 @@
 import frappe
 from frappe import _
 
+from material_requisition.pagination import decode_cursor, encode_cursor, stream_ndjson
+from material_requisition.status_counters import STATUS_CONDITIONS, get_request_status, get_status_counts
+
+MAX_PAGE_SIZE = 500
+
 @frappe.whitelist()
-def get_dashboard_data():
+def get_dashboard_data(company=None, project=None):
     """Get dashboard statistics and recent requests"""
     
     try:
-        # Get status counts
-        status_counts = frappe.db.sql("""
-            SELECT 
-                CASE 
-                    WHEN per_ordered = 0 THEN 'pending'
-                    WHEN per_ordered = 100 AND per_received < 100 THEN 'ordered'
-                    WHEN per_ordered > 0 AND per_ordered < 100 THEN 'partial'
-                    WHEN per_received = 100 THEN 'received'
-                    ELSE 'pending'
-                END as status,
-                COUNT(*) as count
-            FROM `tabMaterial Request`
-            WHERE docstatus = 1
-            GROUP BY status
-        """, as_dict=True)
+        # Status counts are maintained incrementally by document events
+        status_counts = get_status_counts(company, project)
         
         # Get recent requests
+        filters = {"docstatus": 1}
+        if company:
+            filters["company"] = company
+        if project:
+            filters["project"] = project
+
         recent_requests = frappe.get_all(
             "Material Request",
-            filters={"docstatus": 1},
+            filters=filters,
             fields=[
                 "name", 
                 "transaction_date", 
@@ -40,14 +38,7 @@ def get_dashboard_data():
         
         # Add status to recent requests
         for request in recent_requests:
-            if request.per_received == 100:
-                request.status = 'received'
-            elif request.per_ordered == 100:
-                request.status = 'ordered'
-            elif request.per_ordered > 0:
-                request.status = 'partial'
-            else:
-                request.status = 'pending'
+            request.status = get_request_status(request.per_ordered, request.per_received)
         
         return {
             "status_counts": status_counts,
@@ -67,34 +58,62 @@ def get_dashboard_data():
         }
 
 @frappe.whitelist()
-def get_material_requests_by_status(status=None):
-    """Get material requests filtered by status"""
+def get_material_requests_by_status(status=None, limit=50, cursor=None, format="json"):
+    """Get material requests filtered by status
+
+    Results are paged newest first with an opaque ``cursor`` taken from the previous
+    page's ``next_cursor``. ``format="ndjson"`` instead streams every matching request
+    as newline-delimited JSON without buffering the result set.
+    """
+    
+    frappe.has_permission("Material Request", "read", throw=True)
+    
+    conditions = ["docstatus = 1"]
+    values = {}
+    
+    if status in STATUS_CONDITIONS:
+        conditions.append(STATUS_CONDITIONS[status])
+    
+    fields = """
+        name,
+        transaction_date,
+        per_ordered,
+        per_received,
+        total_qty,
+        creation
+    """
+    
+    if format == "ndjson":
+        return stream_ndjson(f"""
+            SELECT {fields}
+            FROM `tabMaterial Request`
+            WHERE {" AND ".join(conditions)}
+            ORDER BY creation DESC, name DESC
+        """, values)
+    
+    limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
     
-    filters = {"docstatus": 1}
+    # Seek past the last request of the previous page
+    if cursor:
+        values["cursor_creation"], values["cursor_name"] = decode_cursor(cursor, 2)
+        conditions.append("""(
+            creation < %(cursor_creation)s
+            OR (creation = %(cursor_creation)s AND name < %(cursor_name)s)
+        )""")
     
-    if status == 'pending':
-        filters["per_ordered"] = 0
-    elif status == 'ordered':
-        filters["per_ordered"] = 100
-        filters["per_received"] = ["<", 100]
-    elif status == 'partial':
-        filters["per_ordered"] = [">", 0]
-        filters["per_ordered"] = ["<", 100]
-    elif status == 'received':
-        filters["per_received"] = 100
+    requests = frappe.db.sql(f"""
+        SELECT {fields}
+        FROM `tabMaterial Request`
+        WHERE {" AND ".join(conditions)}
+        ORDER BY creation DESC, name DESC
+        LIMIT {limit + 1}
+    """, values, as_dict=True)
     
-    requests = frappe.get_all(
-        "Material Request",
-        filters=filters,
-        fields=[
-            "name",
-            "transaction_date",
-            "per_ordered",
-            "per_received",
-            "total_qty",
-            "creation"
-        ],
-        order_by="creation desc"
-    )
+    has_more = len(requests) > limit
+    requests = requests[:limit]
     
-    return requests
+    return {
+        "requests": requests,
+        "has_more": has_more,
+        "next_cursor": encode_cursor([requests[-1].creation, requests[-1].name]) if has_more else None
+    }
@@ -0,0 +1,33 @@
+import frappe
+
+from material_requisition.instrumentation import (
+    clear_calls,
+    get_call_summary,
+    get_recent_calls,
+    get_slow_calls,
+)
+
+@frappe.whitelist()
+def get_api_stats(limit=100, method=None):
+    """Per-endpoint latency and query statistics from the recent call buffer
+
+    Returns the per-method summary, the most recent calls and the sampled slow
+    calls with their SQL. System Managers only.
+    """
+
+    frappe.only_for("System Manager")
+
+    return {
+        "summary": get_call_summary(),
+        "recent_calls": get_recent_calls(int(limit), method),
+        "slow_calls": get_slow_calls()
+    }
+
+@frappe.whitelist(methods=["POST"])
+def clear_api_stats():
+    """Empty the recent and slow call buffers"""
+
+    frappe.only_for("System Manager")
+    clear_calls()
+
+    return {"status": "success"}
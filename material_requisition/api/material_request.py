@@ -1,57 +1,89 @@
+import json
+
 import frappe
 from frappe import _
-from frappe.utils import today, add_days
+from frappe.utils import today, add_days, cint, flt
+from werkzeug.wrappers import Response
+
+from material_requisition import item_search, line_item_search
+from material_requisition.defaults import get_default_warehouse, get_stock_uoms
+from material_requisition.idempotency import idempotent
+from material_requisition.item_catalog import get_catalog, get_catalog_delta, get_default_item_image
+from material_requisition.jobs import create_job, get_job, update_job
+from material_requisition.loaders import load_request_items
+from material_requisition.pagination import decode_cursor, encode_cursor
+from material_requisition.po_links import get_purchase_order_links
+
+MAX_CATALOG_PAGE_LENGTH = 1000
+
+MAX_REQUEST_PAGE_SIZE = 200
+
+BULK_CHUNK_SIZE = 20
 
 @frappe.whitelist()
-def get_visual_items(category=None):
-    """Get items with images for visual selection"""
-    
-    filters = {"disabled": 0, "is_stock_item": 1}
-    if category:
-        filters["item_group"] = category
+def get_visual_items(category=None, start=0, page_length=100, since_version=None, versioned=False):
+    """Get items with images for visual selection
+
+    Items come from the cached, versioned catalog in item_catalog. Without
+    ``versioned`` or ``since_version`` a plain list of items is returned as before.
+    Versioned clients get the catalog ``version`` back and may send it as
+    ``since_version`` (or an ``If-None-Match`` header) to receive a 304 or only the
+    changed items.
+    """
     
     try:
-        items = frappe.get_all(
-            "Item",
-            filters=filters,
-            fields=[
-                "item_code", 
-                "item_name", 
-                "item_group", 
-                "image", 
-                "description",
-                "stock_uom"
-            ],
-            limit=100,
-            order_by="item_name"
-        )
-        
-        # Add default images for common construction items
-        for item in items:
-            if not item.image:
-                item.image = get_default_item_image(item.item_group)
-        
-        return items
+        start = max(int(start), 0)
+        page_length = min(max(int(page_length), 1), MAX_CATALOG_PAGE_LENGTH)
+        if_none_match = (frappe.get_request_header("If-None-Match") or "").strip('"')
+
+        catalog = get_catalog(category)
+        items = catalog["items"]
+
+        if not (cint(versioned) or since_version or if_none_match):
+            return items[start:start + page_length]
+
+        # The client already holds the current catalog
+        if catalog["version"] in (since_version, if_none_match):
+            return Response(status=304, headers={"ETag": f'"{catalog["version"]}"'})
+
+        result = {
+            "version": catalog["version"],
+            "total_count": len(items),
+            "start": start,
+            "has_more": start + page_length < len(items)
+        }
+
+        delta = get_catalog_delta(category, since_version) if since_version else None
+        if delta is not None:
+            result.update(delta=True, items=delta["updated"], removed=delta["removed"])
+        else:
+            result.update(delta=False, items=items[start:start + page_length], removed=[])
+
+        return result
         
     except Exception as e:
         frappe.log_error(f"Get Visual Items Error: {str(e)}")
         return []
 
-def get_default_item_image(item_group):
-    """Get default image based on item group"""
-    image_map = {
-        "Pipes": "/assets/material_requisition/images/pipe.png",
-        "Fittings": "/assets/material_requisition/images/fitting.png",
-        "Electrical": "/assets/material_requisition/images/electrical.png",
-        "Hardware": "/assets/material_requisition/images/hardware.png",
-        "Tools": "/assets/material_requisition/images/tools.png",
-        "Safety": "/assets/material_requisition/images/safety.png"
-    }
-    return image_map.get(item_group, "/assets/material_requisition/images/default.png")
+@frappe.whitelist()
+def search_items(query, limit=10):
+    """Typeahead item search by code, name or description, most requested first"""
+
+    try:
+        return item_search.search_items(query, limit=min(max(int(limit), 1), 50))
+
+    except Exception as e:
+        frappe.log_error(f"Search Items Error: {str(e)}")
+        return []
 
 @frappe.whitelist()
-def create_simplified_material_request(items, project=None, required_date=None, notes=None, required_by_date=None, delivery_date=None):
-    """Create material request with simplified workflow"""
+@idempotent("create_simplified_material_request")
+def create_simplified_material_request(items, project=None, required_date=None, notes=None, required_by_date=None, delivery_date=None, async_submit=False):
+    """Create material request with simplified workflow
+
+    With ``async_submit`` the request is only validated here; insert and submit run
+    in a background job and a ``job_id`` is returned for get_material_request_job.
+    """
 
     try:
         if not items:
@@ -59,41 +91,22 @@ def create_simplified_material_request(items, project=None, required_date=None,
 
         # Parse items if it's a string
         if isinstance(items, str):
-            import json
             items = json.loads(items)
 
-        doc = frappe.new_doc("Material Request")
-        doc.material_request_type = "Purchase"
-        doc.transaction_date = today()
-
-        # Set schedule date (required by date takes priority)
-        if required_by_date:
-            doc.schedule_date = required_by_date
-        elif required_date:
-            doc.schedule_date = required_date
-        else:
-            doc.schedule_date = add_days(today(), 7)
-
-        if project:
-            doc.project = project
-
-        # Combine notes with delivery date info
-        notes_text = notes or "Created from Promep interface"
-        if delivery_date:
-            notes_text += f"\nExpected Delivery Date: {delivery_date}"
-
-        doc.remarks = notes_text
-        
-        # Add items
-        for item in items:
-            doc.append("items", {
-                "item_code": item["item_code"],
-                "qty": item["qty"],
-                "uom": item.get("uom", "Nos"),
-                "schedule_date": doc.schedule_date,
-                "warehouse": get_default_warehouse()
+        if cint(async_submit):
+            return enqueue_material_request({
+                "items": items,
+                "project": project,
+                "required_date": required_date,
+                "notes": notes,
+                "required_by_date": required_by_date,
+                "delivery_date": delivery_date
             })
-        
+
+        doc = build_material_request(
+            items, project, required_date, notes, required_by_date, delivery_date,
+            warehouse=get_default_warehouse()
+        )
         doc.insert()
         doc.submit()
         
@@ -107,25 +120,221 @@ def create_simplified_material_request(items, project=None, required_date=None,
         frappe.log_error(f"Create Material Request Error: {str(e)}")
         frappe.throw(_("Failed to create material request: {0}").format(str(e)))
 
-def get_default_warehouse():
-    """Get default warehouse for material requests"""
+def enqueue_material_request(request):
+    """Validate a simplified request cheaply and queue its insert and submit"""
+
+    frappe.has_permission("Material Request", "create", throw=True)
+
+    errors = validate_bulk_requests([request]).get(0)
+    if errors:
+        frappe.throw("; ".join(errors))
+
+    job_id = create_job("material_request")
+    frappe.enqueue(
+        "material_requisition.api.material_request.process_material_request_job",
+        queue="short",
+        job_id=job_id,
+        request=request,
+        enqueue_after_commit=True
+    )
+
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "message": _("Material request queued for submission")
+    }
+
+def process_material_request_job(job_id, request):
+    """Background job inserting and submitting a queued material request"""
+
+    update_job(job_id, status="running")
     try:
-        # Try to get from company settings
-        company = frappe.defaults.get_user_default("Company")
-        if company:
-            company_doc = frappe.get_doc("Company", company)
-            if hasattr(company_doc, 'default_warehouse'):
-                return company_doc.default_warehouse
-        
-        # Fallback to first available warehouse
-        warehouse = frappe.get_all("Warehouse", limit=1)
-        if warehouse:
-            return warehouse[0].name
-            
-        return None
-        
-    except Exception:
-        return None
+        doc = build_material_request(
+            request["items"],
+            request.get("project"),
+            request.get("required_date"),
+            request.get("notes"),
+            request.get("required_by_date"),
+            request.get("delivery_date"),
+            warehouse=get_default_warehouse()
+        )
+        doc.insert()
+        doc.submit()
+        frappe.db.commit()
+
+        update_job(job_id, status="success", name=doc.name, message=_("Material request created successfully"))
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Create Material Request Job Error: {str(e)}")
+        update_job(job_id, status="error", message=str(e))
+
+@frappe.whitelist()
+def get_material_request_job(job_id):
+    """Get the status of a queued material request submission"""
+    return get_job(job_id)
+
+def build_material_request(items, project=None, required_date=None, notes=None, required_by_date=None,
+                           delivery_date=None, warehouse=None):
+    """Build an unsaved Purchase material request from simplified request data"""
+
+    doc = frappe.new_doc("Material Request")
+    doc.material_request_type = "Purchase"
+    doc.transaction_date = today()
+
+    # Set schedule date (required by date takes priority)
+    if required_by_date:
+        doc.schedule_date = required_by_date
+    elif required_date:
+        doc.schedule_date = required_date
+    else:
+        doc.schedule_date = add_days(today(), 7)
+
+    if project:
+        doc.project = project
+
+    # Combine notes with delivery date info
+    notes_text = notes or "Created from Promep interface"
+    if delivery_date:
+        notes_text += f"\nExpected Delivery Date: {delivery_date}"
+
+    doc.remarks = notes_text
+
+    # Add items, defaulting to each item's stock UOM
+    stock_uoms = get_stock_uoms(item["item_code"] for item in items)
+    for item in items:
+        doc.append("items", {
+            "item_code": item["item_code"],
+            "qty": item["qty"],
+            "uom": item.get("uom") or stock_uoms[item["item_code"]],
+            "schedule_date": doc.schedule_date,
+            "warehouse": item.get("warehouse") or warehouse
+        })
+
+    return doc
+
+@frappe.whitelist()
+@idempotent("create_material_requests_bulk")
+def create_material_requests_bulk(requests, chunk_size=BULK_CHUNK_SIZE):
+    """Create and submit many material requests in one call
+
+    Every item code, UOM, project and warehouse referenced by the batch is
+    validated with one query per doctype up front. Valid requests are then
+    inserted and submitted in chunks, committing after each chunk. A failing
+    request is rolled back on its own and reported without stopping the batch.
+
+    Returns one result per input request, in order.
+    """
+
+    if isinstance(requests, str):
+        requests = json.loads(requests)
+
+    if not requests:
+        frappe.throw(_("No material requests to create"))
+
+    frappe.has_permission("Material Request", "create", throw=True)
+
+    results = [None] * len(requests)
+    valid = []
+    errors_by_index = validate_bulk_requests(requests)
+    for index, request in enumerate(requests):
+        if errors_by_index.get(index):
+            results[index] = {
+                "index": index,
+                "status": "error",
+                "message": "; ".join(errors_by_index[index])
+            }
+        else:
+            valid.append((index, request))
+
+    # Resolved once for the whole batch instead of once per item row
+    default_warehouse = get_default_warehouse()
+
+    chunk_size = max(int(chunk_size), 1)
+    for start in range(0, len(valid), chunk_size):
+        for index, request in valid[start:start + chunk_size]:
+            savepoint = f"bulk_material_request_{index}"
+            frappe.db.savepoint(savepoint)
+            try:
+                doc = build_material_request(
+                    request["items"],
+                    request.get("project"),
+                    request.get("required_date"),
+                    request.get("notes"),
+                    request.get("required_by_date"),
+                    request.get("delivery_date"),
+                    warehouse=request.get("warehouse") or default_warehouse
+                )
+                doc.insert()
+                doc.submit()
+                results[index] = {"index": index, "status": "success", "name": doc.name}
+
+            except Exception as e:
+                frappe.db.rollback(save_point=savepoint)
+                frappe.log_error(f"Bulk Create Material Request Error: {str(e)}")
+                results[index] = {"index": index, "status": "error", "message": str(e)}
+
+        frappe.db.commit()
+
+    return results
+
+def validate_bulk_requests(requests):
+    """Validate a batch of simplified requests with one query per referenced doctype
+
+    Returns a dict of request index -> list of error messages.
+    """
+
+    item_codes, uoms, projects, warehouses = set(), set(), set(), set()
+    for request in requests:
+        if request.get("project"):
+            projects.add(request["project"])
+        if request.get("warehouse"):
+            warehouses.add(request["warehouse"])
+        for item in request.get("items") or []:
+            item_codes.add(item.get("item_code"))
+            if item.get("uom"):
+                uoms.add(item["uom"])
+            if item.get("warehouse"):
+                warehouses.add(item["warehouse"])
+
+    def existing(doctype, names, filters=None):
+        if not names:
+            return set()
+        return set(frappe.get_all(
+            doctype,
+            filters={"name": ["in", list(names)], **(filters or {})},
+            pluck="name"
+        ))
+
+    valid_items = existing("Item", item_codes - {None}, {"disabled": 0})
+    valid_uoms = existing("UOM", uoms)
+    valid_projects = existing("Project", projects)
+    valid_warehouses = existing("Warehouse", warehouses, {"is_group": 0, "disabled": 0})
+
+    errors_by_index = {}
+    for index, request in enumerate(requests):
+        errors = []
+        if not request.get("items"):
+            errors.append(_("No items selected"))
+        if request.get("project") and request["project"] not in valid_projects:
+            errors.append(_("Invalid project {0}").format(request["project"]))
+        if request.get("warehouse") and request["warehouse"] not in valid_warehouses:
+            errors.append(_("Invalid warehouse {0}").format(request["warehouse"]))
+
+        for item in request.get("items") or []:
+            if item.get("item_code") not in valid_items:
+                errors.append(_("Invalid or disabled item {0}").format(item.get("item_code")))
+            if item.get("uom") and item["uom"] not in valid_uoms:
+                errors.append(_("Invalid UOM {0}").format(item.get("uom")))
+            if item.get("warehouse") and item["warehouse"] not in valid_warehouses:
+                errors.append(_("Invalid warehouse {0}").format(item["warehouse"]))
+            if flt(item.get("qty")) <= 0:
+                errors.append(_("Quantity must be positive for item {0}").format(item.get("item_code")))
+
+        if errors:
+            errors_by_index[index] = errors
+
+    return errors_by_index
 
 @frappe.whitelist()
 def get_material_request_details(name):
@@ -199,10 +408,12 @@ def get_suppliers_for_items(item_codes):
         return {"item_suppliers": [], "all_suppliers": []}
 
 @frappe.whitelist()
-def get_requests_with_po_status():
-    """Get material requests with purchase order status"""
+def get_requests_with_po_status(limit=50):
+    """Get the newest material requests with purchase order status"""
 
     try:
+        limit = min(max(int(limit), 1), MAX_REQUEST_PAGE_SIZE)
+
         # Get material requests
         requests = frappe.get_all(
             "Material Request",
@@ -213,22 +424,20 @@ def get_requests_with_po_status():
                 "owner", "creation"
             ],
             order_by="creation desc",
-            limit=50
+            limit=limit
         )
 
-        # Get items for each request
+        # Load items and related purchase orders for the whole page at once
+        names = [request["name"] for request in requests]
+        items_by_request = load_request_items(names, fields=[
+            "item_code", "item_name", "qty", "uom",
+            "ordered_qty", "received_qty", "rate", "amount"
+        ])
+        orders_by_request = get_purchase_order_links(names)
+
         for request in requests:
-            request["items"] = frappe.get_all(
-                "Material Request Item",
-                filters={"parent": request["name"]},
-                fields=[
-                    "item_code", "item_name", "qty", "uom",
-                    "ordered_qty", "received_qty", "rate", "amount"
-                ]
-            )
-
-            # Get related purchase orders
-            request["purchase_orders"] = get_purchase_orders_for_request(request["name"])
+            request["items"] = items_by_request[request["name"]]
+            request["purchase_orders"] = orders_by_request[request["name"]]
 
         return requests
 
@@ -236,229 +445,211 @@ def get_requests_with_po_status():
         frappe.log_error(f"Get Requests with PO Status Error: {str(e)}")
         return []
 
-@frappe.whitelist()
-def get_request_detail(request_name):
-    """Get detailed information about a specific material request"""
-
-    try:
-        doc = frappe.get_doc("Material Request", request_name)
-
-        # Get items with additional details
-        items = []
-        for item in doc.items:
-            items.append({
-                "item_code": item.item_code,
-                "item_name": getattr(item, 'item_name', ''),
-                "description": getattr(item, 'description', ''),
-                "qty": item.qty,
-                "uom": getattr(item, 'uom', ''),
-                "ordered_qty": getattr(item, 'ordered_qty', 0),
-                "received_qty": getattr(item, 'received_qty', 0),
-                "rate": getattr(item, 'rate', 0),
-                "amount": getattr(item, 'amount', 0)
-            })
-
-        # Get related purchase orders
-        purchase_orders = get_purchase_orders_for_request(request_name)
-
-        # Calculate total quantity
-        total_qty = sum(item.qty for item in doc.items)
-
-        return {
-            "name": doc.name,
-            "transaction_date": doc.transaction_date,
-            "schedule_date": getattr(doc, 'schedule_date', None),
-            "status": doc.status,
-            "per_ordered": getattr(doc, 'per_ordered', 0),
-            "per_received": getattr(doc, 'per_received', 0),
-            "material_request_type": getattr(doc, 'material_request_type', ''),
-            "company": getattr(doc, 'company', ''),
-            "items": items,
-            "total_qty": total_qty,
-            "purchase_orders": purchase_orders
-        }
-
-    except Exception as e:
-        frappe.log_error(f"Get Request Detail Error: {str(e)}")
-        return {"error": f"Failed to get request details: {str(e)}"}
-
 def get_purchase_orders_for_request(material_request_name):
     """Get purchase orders related to a material request"""
 
     try:
-        # Get PO items that reference this material request
-        po_items = frappe.get_all(
-            "Purchase Order Item",
-            filters={"material_request": material_request_name},
-            fields=["parent"],
-            group_by="parent"
-        )
-
-        if not po_items:
-            return []
-
-        po_names = [item["parent"] for item in po_items]
-
-        # Get PO details
-        purchase_orders = frappe.get_all(
-            "Purchase Order",
-            filters={"name": ["in", po_names]},
-            fields=[
-                "name", "supplier", "supplier_name", "transaction_date",
-                "status", "grand_total", "currency"
-            ]
-        )
-
-        return purchase_orders
+        return get_purchase_order_links([material_request_name])[material_request_name]
 
     except Exception as e:
         frappe.log_error(f"Get Purchase Orders for Request Error: {str(e)}")
         return []
 
 @frappe.whitelist()
-def get_line_items(status_filter=None, item_filter=None, supplier_filter=None, limit=100, offset=0):
-    """Get all line items from material requests with filtering options"""
+def get_line_items(status_filter=None, item_filter=None, supplier_filter=None, limit=100, offset=0,
+                   pagination="offset", cursor=None, count_mode=None):
+    """Get all line items from material requests with filtering options
+
+    Two paging modes are supported:
+    - ``pagination="offset"`` (default) keeps the LIMIT/OFFSET behaviour used by LineItemsView
+    - ``pagination="cursor"`` seeks past the opaque ``cursor`` returned as ``next_cursor``
+      by the previous page, so deep pages cost the same as the first one
+
+    ``count_mode`` is one of ``exact``, ``estimate`` or ``none``. It defaults to ``exact``
+    in offset mode and ``none`` in cursor mode. An invalid ``cursor`` raises a
+    ValidationError instead of returning an empty page.
+    """
+
+    use_cursor = pagination == "cursor"
+    cursor_values = decode_line_item_cursor(cursor) if use_cursor and cursor else None
 
     try:
+        limit = int(limit)
+        count_mode = count_mode or ("none" if use_cursor else "exact")
 
-        # Build base query conditions
-        conditions = ["mr.docstatus = 1"]
+        # The ProMEP Line Item read model only holds lines of submitted requests
+        conditions = ["1=1"]
+        values = {}
 
         # Add status filter
         if status_filter and status_filter != 'all':
             if status_filter == 'pending':
-                conditions.append("(mr.per_ordered = 0 OR mr.per_ordered IS NULL)")
+                conditions.append("li.per_ordered = 0")
             elif status_filter == 'partial':
-                conditions.append("mr.per_ordered > 0 AND mr.per_ordered < 100")
+                conditions.append("li.per_ordered > 0 AND li.per_ordered < 100")
             elif status_filter == 'ordered':
-                conditions.append("mr.per_ordered = 100 AND (mr.per_received < 100 OR mr.per_received IS NULL)")
+                conditions.append("li.per_ordered = 100 AND li.per_received < 100")
             elif status_filter == 'received':
-                conditions.append("mr.per_received = 100")
+                conditions.append("li.per_received = 100")
 
-        # Add item filter
+        # Add item filter (FULLTEXT prefix search, see line_item_search)
         if item_filter:
-            conditions.append(f"(mri.item_code LIKE '%{item_filter}%' OR mri.item_name LIKE '%{item_filter}%')")
-
-        where_clause = " AND ".join(conditions)
+            search_condition = line_item_search.get_search_condition(item_filter, values)
+            if search_condition:
+                conditions.append(search_condition)
+
+        filter_clause = " AND ".join(conditions)
+
+        # Seek past the last row of the previous page
+        page_conditions = list(conditions)
+        if cursor_values:
+            values.update(cursor_values)
+            page_conditions.append("""(
+                li.request_creation < %(cursor_creation)s
+                OR (li.request_creation = %(cursor_creation)s AND li.material_request < %(cursor_parent)s)
+                OR (li.request_creation = %(cursor_creation)s AND li.material_request = %(cursor_parent)s
+                    AND li.reverse_idx < -%(cursor_idx)s)
+            )""")
+
+        where_clause = " AND ".join(page_conditions)
+
+        # Fetch one extra row so has_more is known without counting
+        if use_cursor:
+            page_clause = f"LIMIT {limit + 1}"
+        else:
+            page_clause = f"LIMIT {limit + 1} OFFSET {int(offset)}"
 
-        # Get line items with material request details
+        # Line items, status and suppliers are all precomputed in the read model. Every
+        # sort column is descending, so the (request_creation, material_request,
+        # reverse_idx) index is read backwards and the scan stops at the LIMIT
         query = f"""
             SELECT
-                mri.name as line_item_id,
-                mri.item_code,
-                mri.item_name,
-                mri.description,
-                mri.qty,
-                mri.uom,
-                COALESCE(mri.ordered_qty, 0) as ordered_qty,
-                COALESCE(mri.received_qty, 0) as received_qty,
-                mri.rate,
-                mri.amount,
-                mri.schedule_date as item_schedule_date,
-                mr.name as material_request,
-                mr.transaction_date,
-                mr.schedule_date as request_schedule_date,
-                mr.status as request_status,
-                COALESCE(mr.per_ordered, 0) as per_ordered,
-                COALESCE(mr.per_received, 0) as per_received,
-                mr.company,
-                mr.owner as requested_by,
-                (mri.qty - COALESCE(mri.ordered_qty, 0)) as pending_qty,
-                CASE
-                    WHEN COALESCE(mri.received_qty, 0) >= mri.qty THEN 'received'
-                    WHEN COALESCE(mri.ordered_qty, 0) >= mri.qty THEN 'ordered'
-                    WHEN COALESCE(mri.ordered_qty, 0) > 0 THEN 'partial'
-                    ELSE 'pending'
-                END as item_status
-            FROM `tabMaterial Request Item` mri
-            LEFT JOIN `tabMaterial Request` mr ON mri.parent = mr.name
+                li.name as line_item_id,
+                li.item_code,
+                li.item_name,
+                li.description,
+                li.qty,
+                li.uom,
+                li.ordered_qty,
+                li.received_qty,
+                li.rate,
+                li.amount,
+                li.item_schedule_date,
+                li.idx,
+                li.material_request,
+                li.transaction_date,
+                li.request_schedule_date,
+                li.request_status,
+                li.per_ordered,
+                li.per_received,
+                li.company,
+                li.requested_by,
+                li.request_creation,
+                li.pending_qty,
+                li.item_status,
+                li.suppliers
+            FROM `tabProMEP Line Item` li
             WHERE {where_clause}
-            ORDER BY mr.creation DESC, mri.idx ASC
-            LIMIT {int(limit)} OFFSET {int(offset)}
+            ORDER BY li.request_creation DESC, li.material_request DESC, li.reverse_idx DESC
+            {page_clause}
         """
 
-        line_items = frappe.db.sql(query, as_dict=True)
-
-        # Get supplier information for items that have suppliers
-        item_codes = [item['item_code'] for item in line_items]
-        if item_codes:
-            suppliers_query = """
-                SELECT
-                    itsup.parent as item_code,
-                    itsup.supplier,
-                    sup.supplier_name
-                FROM `tabItem Supplier` itsup
-                LEFT JOIN `tabSupplier` sup ON itsup.supplier = sup.name
-                WHERE itsup.parent IN %(item_codes)s
-                GROUP BY itsup.parent, itsup.supplier
-            """
-            suppliers_data = frappe.db.sql(suppliers_query, {"item_codes": item_codes}, as_dict=True)
-
-            # Create a mapping of item_code to suppliers
-            item_suppliers = {}
-            for supplier_data in suppliers_data:
-                item_code = supplier_data['item_code']
-                if item_code not in item_suppliers:
-                    item_suppliers[item_code] = []
-                item_suppliers[item_code].append({
-                    'supplier': supplier_data['supplier'],
-                    'supplier_name': supplier_data['supplier_name'] or supplier_data['supplier']
-                })
-        else:
-            item_suppliers = {}
+        line_items = frappe.db.sql(query, values, as_dict=True)
+
+        has_more = len(line_items) > limit
+        line_items = line_items[:limit]
+
+        next_cursor = None
+        if has_more and line_items:
+            next_cursor = encode_line_item_cursor(line_items[-1])
 
-        # Add supplier information to line items
         for item in line_items:
-            item['suppliers'] = item_suppliers.get(item['item_code'], [])
-            # Calculate item status based on quantities
-            if item['received_qty'] >= item['qty']:
-                item['item_status'] = 'received'
-            elif item['ordered_qty'] >= item['qty']:
-                item['item_status'] = 'ordered'
-            elif item['ordered_qty'] > 0:
-                item['item_status'] = 'partial'
-            else:
-                item['item_status'] = 'pending'
+            item['suppliers'] = json.loads(item['suppliers'] or "[]")
 
         # Get total count for pagination
         count_query = f"""
             SELECT COUNT(*) as total
-            FROM `tabMaterial Request Item` mri
-            LEFT JOIN `tabMaterial Request` mr ON mri.parent = mr.name
-            WHERE {where_clause}
+            FROM `tabProMEP Line Item` li
+            WHERE {filter_clause}
         """
-        total_count = frappe.db.sql(count_query, as_dict=True)[0]['total']
+        if count_mode == "exact":
+            total_count = frappe.db.sql(count_query, values, as_dict=True)[0]['total']
+        elif count_mode == "estimate":
+            total_count = estimate_row_count(count_query, values)
+        else:
+            total_count = None
 
         return {
             'line_items': line_items,
             'total_count': total_count,
-            'has_more': (int(offset) + len(line_items)) < total_count
+            'total_count_mode': count_mode,
+            'has_more': has_more,
+            'next_cursor': next_cursor
         }
 
     except Exception as e:
         frappe.log_error(f"Get All Line Items Error: {str(e)}")
-        return {'line_items': [], 'total_count': 0, 'has_more': False}
+        return {'line_items': [], 'total_count': 0, 'has_more': False, 'next_cursor': None}
+
+@frappe.whitelist()
+def search_line_items(query, limit=20):
+    """Search submitted line items by item code or name, ranked by relevance"""
+
+    try:
+        return line_item_search.search_line_items(query, limit=min(int(limit), 100))
+
+    except Exception as e:
+        frappe.log_error(f"Search Line Items Error: {str(e)}")
+        return []
+
+def encode_line_item_cursor(line_item):
+    """Build an opaque cursor from the (creation, parent, idx) sort key of a line item"""
+    return encode_cursor([line_item['request_creation'], line_item['material_request'], line_item['idx']])
+
+def decode_line_item_cursor(cursor):
+    """Decode a cursor produced by encode_line_item_cursor into query values"""
+    creation, parent, idx = decode_cursor(cursor, 3)
+    try:
+        idx = int(idx)
+    except (TypeError, ValueError):
+        frappe.throw(_("Invalid cursor"))
+
+    return {
+        "cursor_creation": creation,
+        "cursor_parent": parent,
+        "cursor_idx": idx
+    }
+
+def estimate_row_count(query, values=None):
+    """Estimate the rows a query scans from its EXPLAIN plan instead of counting them"""
+    plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+
+    estimate = 1
+    for step in plan:
+        rows = step.get('rows') or 1
+        filtered = step.get('filtered') or 100
+        estimate *= rows * filtered / 100
+
+    return int(estimate)
 
 @frappe.whitelist()
 def get_request_detail(request_name):
     """Get detailed information about a specific material request"""
     try:
-        # Get the material request
-        mr = frappe.get_doc("Material Request", request_name)
-
-        # Check permissions
-        if not frappe.has_permission("Material Request", "read", mr):
+        # Get the material request header
+        mr = frappe.db.get_value("Material Request", request_name, "*", as_dict=True)
+        if not mr:
+            frappe.throw(_("Material Request {0} not found").format(request_name))
+
+        # Check permissions on the header alone; passing the name would make Frappe
+        # load the document with all its child rows
+        header = frappe.get_doc({**mr, "doctype": "Material Request"})
+        if not frappe.has_permission("Material Request", "read", header):
             frappe.throw("Not permitted to read this Material Request")
 
-        # Get related purchase orders
-        purchase_orders = frappe.db.sql("""
-            SELECT DISTINCT po.name, po.supplier, po.transaction_date,
-                   po.status, po.grand_total
-            FROM `tabPurchase Order` po
-            JOIN `tabPurchase Order Item` poi ON poi.parent = po.name
-            WHERE poi.material_request = %s AND po.docstatus = 1
-            ORDER BY po.creation DESC
-        """, (request_name,), as_dict=True)
+        # Items come from the shared batched loaders, purchase orders from the link cache
+        items = load_request_items([request_name])[request_name]
+        purchase_orders = get_purchase_order_links([request_name], docstatus=1)[request_name]
 
         # Prepare response data
         result = {
@@ -469,13 +660,15 @@ def get_request_detail(request_name):
             'per_ordered': mr.per_ordered,
             'per_received': mr.per_received,
             'company': mr.company,
-            'remarks': getattr(mr, 'remarks', None),
+            'material_request_type': mr.material_request_type,
+            'remarks': mr.remarks,
             'items': [],
+            'total_qty': sum(item.qty for item in items),
             'purchase_orders': purchase_orders
         }
 
         # Add items
-        for item in mr.items:
+        for item in items:
             result['items'].append({
                 'item_code': item.item_code,
                 'item_name': item.item_name,
@@ -1,6 +1,18 @@
 import frappe
 from frappe import _
-from frappe.utils import today, add_days
+from frappe.utils import today, add_days, cint, flt
+
+from material_requisition.defaults import get_default_company, get_default_warehouse
+from material_requisition.idempotency import idempotent
+from material_requisition.jobs import create_job, get_job, get_job_progress, record_job_chunk
+from material_requisition.loaders import load_line_items
+from material_requisition.pagination import decode_cursor, encode_cursor
+from material_requisition.po_links import get_purchase_order_links
+from material_requisition.supplier_preferences import partition_by_supplier
+
+BULK_PO_CHUNK_SIZE = 10
+
+MAX_PENDING_PAGE_SIZE = 500
 
 @frappe.whitelist()
 def create_purchase_order_from_material_request(material_request, supplier, required_date=None):
@@ -12,6 +24,17 @@ def create_purchase_order_from_material_request(material_request, supplier, requ
         
         # Get material request document
         mr_doc = frappe.get_doc("Material Request", material_request)
+
+        # Lock the lines and re-read their ordered quantities, so orders running in
+        # parallel (e.g. other bulk batches) cannot order the same quantity twice
+        locked_lines = load_line_items(
+            [mr_item.name for mr_item in mr_doc.items],
+            fields=["name", "ordered_qty"],
+            for_update=True
+        )
+        for mr_item in mr_doc.items:
+            if mr_item.name in locked_lines:
+                mr_item.ordered_qty = flt(locked_lines[mr_item.name].ordered_qty)
         
         # Create purchase order
         po_doc = frappe.new_doc("Purchase Order")
@@ -52,82 +75,240 @@ def create_purchase_order_from_material_request(material_request, supplier, requ
         frappe.throw(_("Failed to create purchase order: {0}").format(str(e)))
 
 @frappe.whitelist()
-def get_pending_material_requests():
-    """Get material requests that are pending purchase orders"""
-    
+def get_pending_material_requests(company=None, project=None, from_date=None, to_date=None, limit=50, cursor=None):
+    """Get material requests that are pending purchase orders
+
+    Reads one page of requests and their open lines from the ProMEP Line Item read
+    model in a single query, newest first. ``from_date`` and ``to_date`` bound the
+    request schedule date. Pass the previous page's ``next_cursor`` as ``cursor``; an
+    invalid cursor raises a ValidationError instead of returning an empty page.
+    """
+
+    frappe.has_permission("Material Request", "read", throw=True)
+    cursor_key = decode_cursor(cursor, 2) if cursor else None
+
     try:
-        requests = frappe.db.sql("""
-            SELECT 
-                mr.name,
-                mr.transaction_date,
-                mr.schedule_date,
-                mr.per_ordered,
-                COUNT(mri.name) as item_count,
-                SUM(mri.qty - mri.ordered_qty) as pending_qty
-            FROM `tabMaterial Request` mr
-            LEFT JOIN `tabMaterial Request Item` mri ON mr.name = mri.parent
-            WHERE mr.docstatus = 1 
-                AND mr.material_request_type = 'Purchase'
-                AND mr.per_ordered < 100
-            GROUP BY mr.name
-            ORDER BY mr.creation DESC
-        """, as_dict=True)
-        
-        # Get items for each request
-        for request in requests:
-            items = frappe.get_all(
-                "Material Request Item",
-                filters={
-                    "parent": request.name,
-                    "qty": [">", "ordered_qty"]
-                },
-                fields=[
-                    "item_code",
-                    "item_name", 
-                    "qty",
-                    "ordered_qty",
-                    "uom"
-                ]
-            )
-            request.items = items
-        
-        return requests
-        
+        conditions = [
+            "material_request_type = 'Purchase'",
+            "per_ordered < 100"
+        ]
+        values = {}
+
+        if company:
+            conditions.append("company = %(company)s")
+            values["company"] = company
+        if project:
+            conditions.append("project = %(project)s")
+            values["project"] = project
+        if from_date:
+            conditions.append("request_schedule_date >= %(from_date)s")
+            values["from_date"] = from_date
+        if to_date:
+            conditions.append("request_schedule_date <= %(to_date)s")
+            values["to_date"] = to_date
+
+        limit = min(max(int(limit), 1), MAX_PENDING_PAGE_SIZE)
+
+        # Seek past the last request of the previous page
+        if cursor_key:
+            values["cursor_creation"], values["cursor_name"] = cursor_key
+            conditions.append("""(
+                request_creation < %(cursor_creation)s
+                OR (request_creation = %(cursor_creation)s AND material_request < %(cursor_name)s)
+            )""")
+
+        # The derived table picks the page of requests, the join adds their open lines.
+        # The page is read backwards from the (material_request_type, request_creation,
+        # material_request, per_ordered) index, which also filters ordered lines out
+        # without reading them, so the GROUP BY stops after limit + 1 requests
+        rows = frappe.db.sql(f"""
+            SELECT
+                page.material_request,
+                page.request_creation,
+                page.transaction_date,
+                page.schedule_date,
+                page.per_ordered,
+                page.item_count,
+                page.pending_qty,
+                li.item_code,
+                li.item_name,
+                li.qty,
+                li.ordered_qty,
+                li.uom
+            FROM (
+                SELECT
+                    material_request,
+                    request_creation,
+                    MAX(transaction_date) as transaction_date,
+                    MAX(request_schedule_date) as schedule_date,
+                    MAX(per_ordered) as per_ordered,
+                    COUNT(*) as item_count,
+                    SUM(qty - ordered_qty) as pending_qty
+                FROM `tabProMEP Line Item`
+                WHERE {" AND ".join(conditions)}
+                GROUP BY request_creation, material_request
+                ORDER BY request_creation DESC, material_request DESC
+                LIMIT {limit + 1}
+            ) page
+            LEFT JOIN `tabProMEP Line Item` li
+                ON li.material_request = page.material_request
+                AND li.qty > li.ordered_qty
+            ORDER BY page.request_creation DESC, page.material_request DESC, li.idx ASC
+        """, values, as_dict=True)
+
+        requests = {}
+        for row in rows:
+            request = requests.get(row.material_request)
+            if not request:
+                request = requests[row.material_request] = frappe._dict({
+                    "name": row.material_request,
+                    "creation": row.request_creation,
+                    "transaction_date": row.transaction_date,
+                    "schedule_date": row.schedule_date,
+                    "per_ordered": row.per_ordered,
+                    "item_count": row.item_count,
+                    "pending_qty": row.pending_qty,
+                    "items": []
+                })
+            if row.item_code:
+                request["items"].append({
+                    "item_code": row.item_code,
+                    "item_name": row.item_name,
+                    "qty": row.qty,
+                    "ordered_qty": row.ordered_qty,
+                    "uom": row.uom
+                })
+
+        requests = list(requests.values())
+        has_more = len(requests) > limit
+        requests = requests[:limit]
+
+        return {
+            "requests": requests,
+            "has_more": has_more,
+            "next_cursor": encode_cursor([requests[-1].creation, requests[-1].name]) if has_more else None
+        }
+
     except Exception as e:
         frappe.log_error(f"Get Pending Material Requests Error: {str(e)}")
-        return []
+        return {"requests": [], "has_more": False, "next_cursor": None}
 
 @frappe.whitelist()
-def bulk_create_purchase_orders(requests_data):
-    """Create multiple purchase orders from material requests"""
+def bulk_create_purchase_orders(requests_data, chunk_size=BULK_PO_CHUNK_SIZE):
+    """Create multiple purchase orders from material requests in the background
+
+    The batch is split into chunks that are processed in parallel on the long
+    queue, committing after each chunk. All entries for one material request go to
+    the same chunk, so parallel chunks never order the same request. Returns a ``batch_id`` to poll with
+    get_purchase_order_batch; progress is also published over realtime.
+    """
     
     try:
         if isinstance(requests_data, str):
             import json
             requests_data = json.loads(requests_data)
         
-        results = []
+        if not requests_data:
+            frappe.throw(_("No material requests to order"))
+        
+        frappe.has_permission("Purchase Order", "create", throw=True)
+        
+        chunks = chunk_by_material_request(requests_data, max(int(chunk_size), 1))
+        
+        batch_id = create_job(
+            "purchase_order_batch",
+            total=len(requests_data),
+            total_chunks=len(chunks)
+        )
+        
+        for chunk_index, chunk in enumerate(chunks):
+            frappe.enqueue(
+                "material_requisition.api.purchase_order.process_purchase_order_chunk",
+                queue="long",
+                batch_id=batch_id,
+                chunk_index=chunk_index,
+                requests_data=chunk,
+                enqueue_after_commit=True
+            )
+        
+        return {
+            "batch_id": batch_id,
+            "status": "queued",
+            "total": len(requests_data),
+            "total_chunks": len(chunks)
+        }
         
+    except Exception as e:
+        frappe.log_error(f"Bulk Create Purchase Orders Error: {str(e)}")
+        frappe.throw(_("Failed to create purchase orders"))
+
+def chunk_by_material_request(requests_data, chunk_size):
+    """Split bulk order entries into chunks of about chunk_size entries
+
+    Entries are grouped by material request first and a group is never split, so a
+    chunk may exceed chunk_size when one request has more entries than that.
+    """
+
+    groups = {}
+    for request_data in requests_data:
+        groups.setdefault(request_data.get("material_request"), []).append(request_data)
+
+    chunks = []
+    for group in groups.values():
+        if not chunks or len(chunks[-1]) + len(group) > chunk_size:
+            chunks.append([])
+        chunks[-1].extend(group)
+
+    return chunks
+
+def process_purchase_order_chunk(batch_id, chunk_index, requests_data):
+    """Background job creating the purchase orders of one chunk of a batch
+
+    The chunk is always recorded, with an error per request if the chunk itself
+    fails, so the batch does not stay running.
+    """
+
+    try:
+        results = []
         for request_data in requests_data:
+            savepoint = f"bulk_purchase_order_{len(results)}"
+            frappe.db.savepoint(savepoint)
             try:
                 result = create_purchase_order_from_material_request(
                     request_data.get("material_request"),
                     request_data.get("supplier"),
                     request_data.get("required_date")
                 )
+                result["material_request"] = request_data.get("material_request")
                 results.append(result)
             except Exception as e:
+                frappe.db.rollback(save_point=savepoint)
                 results.append({
                     "material_request": request_data.get("material_request"),
                     "status": "error",
                     "message": str(e)
                 })
-        
-        return results
-        
+
+        frappe.db.commit()
+
     except Exception as e:
-        frappe.log_error(f"Bulk Create Purchase Orders Error: {str(e)}")
-        frappe.throw(_("Failed to create purchase orders"))
+        frappe.db.rollback()
+        frappe.log_error(f"Purchase Order Chunk Error for batch {batch_id}: {str(e)}")
+        results = [
+            {
+                "material_request": request_data.get("material_request"),
+                "status": "error",
+                "message": str(e)
+            }
+            for request_data in requests_data
+        ]
+
+    record_job_chunk(batch_id, chunk_index, results)
+
+@frappe.whitelist()
+def get_purchase_order_batch(batch_id):
+    """Get progress and per material request results of a purchase order batch"""
+    return get_job_progress(get_job(batch_id))
 
 @frappe.whitelist()
 def get_purchase_order_status(material_request):
@@ -135,13 +316,15 @@ def get_purchase_order_status(material_request):
     
     try:
         # Get purchase orders linked to this material request
-        purchase_orders = frappe.db.sql("""
-            SELECT DISTINCT po.name, po.status, po.per_received, po.supplier
-            FROM `tabPurchase Order` po
-            LEFT JOIN `tabPurchase Order Item` poi ON po.name = poi.parent
-            WHERE poi.material_request = %s
-                AND po.docstatus = 1
-        """, (material_request,), as_dict=True)
+        purchase_orders = [
+            {
+                "name": po.name,
+                "status": po.status,
+                "per_received": po.per_received,
+                "supplier": po.supplier
+            }
+            for po in get_purchase_order_links([material_request], docstatus=1)[material_request]
+        ]
         
         return purchase_orders
         
@@ -151,24 +334,24 @@ def get_purchase_order_status(material_request):
 
 @frappe.whitelist()
 def update_material_request_status():
-    """Update material request status based on purchase orders and receipts"""
+    """Queue a status update for material requests changed since the last sync
 
-    try:
-        # This would typically be called by a scheduled job
-        # Update per_ordered and per_received for all material requests
+    The work is done by material_requisition.status_sync, which also runs hourly
+    from the scheduler.
+    """
 
-        material_requests = frappe.get_all(
-            "Material Request",
-            filters={"docstatus": 1, "material_request_type": "Purchase"},
-            fields=["name"]
+    try:
+        frappe.has_permission("Material Request", "write", throw=True)
+
+        frappe.enqueue(
+            "material_requisition.status_sync.sync_material_request_statuses",
+            queue="long",
+            job_id="promep_status_sync",
+            deduplicate=True,
+            enqueue_after_commit=True
         )
 
-        for mr in material_requests:
-            mr_doc = frappe.get_doc("Material Request", mr.name)
-            mr_doc.update_status()
-            mr_doc.save()
-
-        return {"status": "success", "message": "Status updated for all material requests"}
+        return {"status": "queued", "message": "Material request status update queued"}
 
     except Exception as e:
         frappe.log_error(f"Update Material Request Status Error: {str(e)}")
@@ -194,6 +377,7 @@ def get_suppliers():
         return []
 
 @frappe.whitelist()
+@idempotent("create_from_material_request")
 def create_from_material_request(material_request, supplier, required_date=None, notes=None):
     """Enhanced PO creation with additional options"""
 
@@ -204,6 +388,17 @@ def create_from_material_request(material_request, supplier, required_date=None,
         # Get material request document
         mr_doc = frappe.get_doc("Material Request", material_request)
 
+        # Lock the lines and re-read their ordered quantities, so orders running in
+        # parallel (e.g. other bulk batches) cannot order the same quantity twice
+        locked_lines = load_line_items(
+            [mr_item.name for mr_item in mr_doc.items],
+            fields=["name", "ordered_qty"],
+            for_update=True
+        )
+        for mr_item in mr_doc.items:
+            if mr_item.name in locked_lines:
+                mr_item.ordered_qty = flt(locked_lines[mr_item.name].ordered_qty)
+
         # Validate supplier exists
         if not frappe.db.exists("Supplier", supplier):
             frappe.throw(_("Invalid supplier selected"))
@@ -213,7 +408,7 @@ def create_from_material_request(material_request, supplier, required_date=None,
         po_doc.supplier = supplier
         po_doc.transaction_date = today()
         po_doc.schedule_date = required_date or add_days(today(), 14)
-        po_doc.company = mr_doc.company or frappe.defaults.get_user_default("Company")
+        po_doc.company = mr_doc.company or get_default_company()
 
         if notes:
             po_doc.remarks = notes
@@ -231,7 +426,7 @@ def create_from_material_request(material_request, supplier, required_date=None,
                     "schedule_date": po_doc.schedule_date,
                     "material_request": mr_doc.name,
                     "material_request_item": mr_item.name,
-                    "warehouse": mr_item.warehouse or get_default_warehouse()
+                    "warehouse": mr_item.warehouse or get_default_warehouse(po_doc.company)
                 })
                 items_added += 1
 
@@ -254,29 +449,13 @@ def create_from_material_request(material_request, supplier, required_date=None,
         frappe.log_error(f"Enhanced Create Purchase Order Error: {str(e)}")
         frappe.throw(_("Failed to create purchase order: {0}").format(str(e)))
 
-def get_default_warehouse():
-    """Get default warehouse for purchase orders"""
-    try:
-        # Try to get from company settings
-        company = frappe.defaults.get_user_default("Company")
-        if company:
-            company_doc = frappe.get_doc("Company", company)
-            if hasattr(company_doc, 'default_warehouse'):
-                return company_doc.default_warehouse
-
-        # Fallback to first available warehouse
-        warehouse = frappe.get_all("Warehouse", limit=1)
-        if warehouse:
-            return warehouse[0].name
-
-        return None
-
-    except Exception:
-        return None
-
 @frappe.whitelist()
-def get_po_summary_for_requests(material_requests):
-    """Get purchase order summary for multiple material requests"""
+def get_po_summary_for_requests(material_requests, compact=False):
+    """Get purchase order summary for multiple material requests
+
+    ``compact`` returns only the purchase order names, count and total per
+    material request instead of the full purchase order rows.
+    """
 
     try:
         if isinstance(material_requests, str):
@@ -286,30 +465,23 @@ def get_po_summary_for_requests(material_requests):
         if not material_requests:
             return []
 
-        # Get PO summary for each material request
+        orders_by_request = get_purchase_order_links(material_requests, docstatus=1)
+
         summary = []
         for mr_name in material_requests:
-            po_data = frappe.db.sql("""
-                SELECT
-                    po.name,
-                    po.supplier,
-                    po.supplier_name,
-                    po.status,
-                    po.grand_total,
-                    po.transaction_date,
-                    COUNT(poi.name) as item_count
-                FROM `tabPurchase Order` po
-                LEFT JOIN `tabPurchase Order Item` poi ON po.name = poi.parent
-                WHERE poi.material_request = %s
-                    AND po.docstatus = 1
-                GROUP BY po.name
-                ORDER BY po.creation DESC
-            """, (mr_name,), as_dict=True)
-
-            summary.append({
-                "material_request": mr_name,
-                "purchase_orders": po_data
-            })
+            purchase_orders = orders_by_request.get(mr_name, [])
+            if cint(compact):
+                summary.append({
+                    "material_request": mr_name,
+                    "purchase_orders": [po.name for po in purchase_orders],
+                    "po_count": len(purchase_orders),
+                    "grand_total": sum(flt(po.grand_total) for po in purchase_orders)
+                })
+            else:
+                summary.append({
+                    "material_request": mr_name,
+                    "purchase_orders": purchase_orders
+                })
 
         return summary
 
@@ -318,21 +490,33 @@ def get_po_summary_for_requests(material_requests):
         return []
 
 @frappe.whitelist()
-def create_from_selected_items(selected_items, supplier, required_date=None, strategy='single', notes=None):
-    """Create purchase orders from selected line items across multiple material requests"""
+@idempotent("create_from_selected_items")
+def create_from_selected_items(selected_items, supplier=None, required_date=None, strategy='single', notes=None):
+    """Create purchase orders from selected line items across multiple material requests
+
+    ``strategy='by_supplier'`` splits the lines into one purchase order per
+    preferred supplier, created in parallel background jobs; ``supplier`` is then
+    only used for lines without a preferred supplier.
+    """
 
     try:
         if isinstance(selected_items, str):
             import json
             selected_items = json.loads(selected_items)
 
-        if not selected_items or not supplier:
+        if strategy == 'by_supplier':
+            if not selected_items:
+                frappe.throw(_("Selected items are required"))
+        elif not selected_items or not supplier:
             frappe.throw(_("Selected items and supplier are required"))
 
         # Validate supplier exists
-        if not frappe.db.exists("Supplier", supplier):
+        if supplier and not frappe.db.exists("Supplier", supplier):
             frappe.throw(_("Invalid supplier selected"))
 
+        if strategy == 'by_supplier':
+            return enqueue_supplier_purchase_orders(selected_items, supplier, required_date, notes)
+
         # Group items by material request
         items_by_request = {}
         for item in selected_items:
@@ -366,6 +550,75 @@ def create_from_selected_items(selected_items, supplier, required_date=None, str
         frappe.log_error(f"Create from Selected Items Error: {str(e)}")
         frappe.throw(_("Failed to create purchase orders: {0}").format(str(e)))
 
+def enqueue_supplier_purchase_orders(selected_items, fallback_supplier=None, required_date=None, notes=None):
+    """Partition selected lines by preferred supplier and queue one purchase order each
+
+    Returns a ``batch_id`` to poll with get_purchase_order_batch, with one result
+    per supplier. Lines without a preferred supplier or fallback are returned as
+    ``unassigned``.
+    """
+
+    frappe.has_permission("Purchase Order", "create", throw=True)
+
+    line_items = load_line_items(
+        [item_data['line_item_id'] for item_data in selected_items],
+        fields=["name", "item_code"]
+    )
+    item_codes = {name: line.item_code for name, line in line_items.items()}
+
+    groups, unassigned = partition_by_supplier(selected_items, item_codes, get_default_company())
+    if fallback_supplier and unassigned:
+        groups.setdefault(fallback_supplier, []).extend(unassigned)
+        unassigned = []
+
+    if not groups:
+        frappe.throw(_("No preferred supplier found for the selected items"))
+
+    batch_id = create_job(
+        "purchase_order_batch",
+        total=len(groups),
+        total_chunks=len(groups)
+    )
+
+    for chunk_index, (supplier, items) in enumerate(groups.items()):
+        frappe.enqueue(
+            "material_requisition.api.purchase_order.process_supplier_purchase_order",
+            queue="long",
+            batch_id=batch_id,
+            chunk_index=chunk_index,
+            supplier=supplier,
+            selected_items=items,
+            required_date=required_date,
+            notes=notes,
+            enqueue_after_commit=True
+        )
+
+    return {
+        "batch_id": batch_id,
+        "status": "queued",
+        "total": len(groups),
+        "total_chunks": len(groups),
+        "suppliers": {supplier: len(items) for supplier, items in groups.items()},
+        "unassigned": [item_data['line_item_id'] for item_data in unassigned]
+    }
+
+def process_supplier_purchase_order(batch_id, chunk_index, supplier, selected_items, required_date=None, notes=None):
+    """Background job creating the purchase order of one supplier in a batch"""
+
+    try:
+        result = create_single_po_from_items(selected_items, supplier, required_date, notes)
+        result["supplier"] = supplier
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        result = {
+            "supplier": supplier,
+            "status": "error",
+            "message": str(e)
+        }
+
+    record_job_chunk(batch_id, chunk_index, [result])
+
 def create_single_po_from_items(selected_items, supplier, required_date=None, notes=None, single_mr=None):
     """Create a single purchase order from selected items"""
 
@@ -375,7 +628,7 @@ def create_single_po_from_items(selected_items, supplier, required_date=None, no
         po_doc.supplier = supplier
         po_doc.transaction_date = today()
         po_doc.schedule_date = required_date or add_days(today(), 14)
-        po_doc.company = frappe.defaults.get_user_default("Company")
+        po_doc.company = get_default_company()
 
         # Add notes
         po_notes = notes or "Created from selected line items"
@@ -386,21 +639,31 @@ def create_single_po_from_items(selected_items, supplier, required_date=None, no
             po_notes += f" (Material Requests: {', '.join(unique_mrs)})"
         po_doc.remarks = po_notes
 
+        # Load and lock every selected line in one query
+        line_items = load_line_items(
+            [item_data['line_item_id'] for item_data in selected_items],
+            fields=["name", "parent", "item_code", "qty", "ordered_qty", "uom", "warehouse"],
+            for_update=True
+        )
+
+        missing = [item_data['line_item_id'] for item_data in selected_items
+                   if item_data['line_item_id'] not in line_items]
+        if missing:
+            frappe.throw(_("Material Request Item {0} not found").format(", ".join(missing)))
+
         items_added = 0
-        processed_items = set()  # To avoid duplicate items
+        processed_items = set()  # To avoid adding the same line twice
 
         for item_data in selected_items:
-            # Get the actual material request item
-            mr_item = frappe.get_doc("Material Request Item", item_data['line_item_id'])
+            mr_item = line_items[item_data['line_item_id']]
 
             # Skip if already processed (in case of duplicates)
-            item_key = f"{mr_item.parent}_{mr_item.item_code}"
-            if item_key in processed_items:
+            if mr_item.name in processed_items:
                 continue
-            processed_items.add(item_key)
+            processed_items.add(mr_item.name)
 
             # Calculate quantity to order
-            qty_to_order = item_data.get('qty', mr_item.qty - mr_item.ordered_qty)
+            qty_to_order = flt(item_data.get('qty', mr_item.qty - flt(mr_item.ordered_qty)))
             if qty_to_order <= 0:
                 continue
 
@@ -412,7 +675,7 @@ def create_single_po_from_items(selected_items, supplier, required_date=None, no
                 "schedule_date": po_doc.schedule_date,
                 "material_request": mr_item.parent,
                 "material_request_item": mr_item.name,
-                "warehouse": mr_item.warehouse or get_default_warehouse()
+                "warehouse": mr_item.warehouse or get_default_warehouse(po_doc.company)
             })
             items_added += 1
 
@@ -0,0 +1,236 @@
+import json
+import subprocess
+import time
+
+import frappe
+
+from material_requisition.jobs import create_job
+from material_requisition.query_stats import QueryRecorder
+
+API_MODULES = [
+    "material_requisition.api.material_request",
+    "material_requisition.api.purchase_order",
+    "material_requisition.api.dashboard",
+]
+
+DEFAULT_ITERATIONS = 20
+
+def get_benchmark_context():
+    """Sample document names the benchmark cases are called with"""
+
+    requests = frappe.get_all(
+        "ProMEP Line Item",
+        filters={"material_request_type": "Purchase", "pending_qty": [">", 0]},
+        fields=["material_request", "name", "item_code", "pending_qty"],
+        order_by="request_creation desc",
+        limit=200
+    )
+    if not requests:
+        frappe.throw("No submitted Purchase material requests with open lines to benchmark against")
+
+    request_names = list(dict.fromkeys(row.material_request for row in requests))
+    supplier = frappe.get_all("Supplier", filters={"disabled": 0}, limit=1, pluck="name")
+    lines = [row for row in requests if row.material_request == request_names[0]]
+
+    return frappe._dict({
+        "material_request": request_names[0],
+        "material_requests": request_names[:50],
+        "item_codes": list(dict.fromkeys(row.item_code for row in requests))[:20],
+        "item_code": requests[0].item_code,
+        "supplier": supplier[0] if supplier else None,
+        "selected_items": [
+            {"line_item_id": line.name, "material_request": line.material_request, "qty": line.pending_qty}
+            for line in lines
+        ],
+        "material_request_job": create_job("benchmark"),
+        "purchase_order_batch": create_job("purchase_order_batch", total=0, total_chunks=0),
+    })
+
+def get_benchmark_cases(context):
+    """Every whitelisted API endpoint with representative arguments
+
+    Returns a list of (case name, method path, kwargs, writes) tuples. Write cases
+    run with commits suppressed and are rolled back after each call.
+    """
+
+    mr = "material_requisition.api.material_request"
+    po = "material_requisition.api.purchase_order"
+    dashboard = "material_requisition.api.dashboard"
+    new_items = [{"item_code": context.item_code, "qty": 1}]
+
+    return [
+        ("get_visual_items", f"{mr}.get_visual_items", {}, False),
+        ("get_visual_items:versioned", f"{mr}.get_visual_items", {"versioned": 1}, False),
+        ("search_items", f"{mr}.search_items", {"query": context.item_code[:4]}, False),
+        ("create_simplified_material_request", f"{mr}.create_simplified_material_request",
+            {"items": new_items}, True),
+        ("create_simplified_material_request:async", f"{mr}.create_simplified_material_request",
+            {"items": new_items, "async_submit": 1}, True),
+        ("get_material_request_job", f"{mr}.get_material_request_job",
+            {"job_id": context.material_request_job}, False),
+        ("create_material_requests_bulk", f"{mr}.create_material_requests_bulk",
+            {"requests": [{"items": new_items}] * 5, "chunk_size": 1000}, True),
+        ("get_material_request_details", f"{mr}.get_material_request_details",
+            {"name": context.material_request}, False),
+        ("get_suppliers_for_items", f"{mr}.get_suppliers_for_items", {"item_codes": context.item_codes}, False),
+        ("get_requests_with_po_status", f"{mr}.get_requests_with_po_status", {}, False),
+        ("get_line_items", f"{mr}.get_line_items", {"limit": 50}, False),
+        ("get_line_items:cursor", f"{mr}.get_line_items",
+            {"limit": 50, "pagination": "cursor", "count_mode": "estimate"}, False),
+        ("get_line_items:search", f"{mr}.get_line_items",
+            {"limit": 50, "item_filter": context.item_code[:4]}, False),
+        ("search_line_items", f"{mr}.search_line_items", {"query": context.item_code[:4]}, False),
+        ("get_request_detail", f"{mr}.get_request_detail", {"request_name": context.material_request}, False),
+        ("test_line_items_debug", f"{mr}.test_line_items_debug", {}, False),
+        ("test_line_items", f"{mr}.test_line_items", {}, False),
+        ("create_purchase_order_from_material_request", f"{po}.create_purchase_order_from_material_request",
+            {"material_request": context.material_request, "supplier": context.supplier}, True),
+        ("get_pending_material_requests", f"{po}.get_pending_material_requests", {}, False),
+        ("bulk_create_purchase_orders", f"{po}.bulk_create_purchase_orders",
+            {"requests_data": [{"material_request": context.material_request, "supplier": context.supplier}]}, True),
+        ("get_purchase_order_batch", f"{po}.get_purchase_order_batch",
+            {"batch_id": context.purchase_order_batch}, False),
+        ("get_purchase_order_status", f"{po}.get_purchase_order_status",
+            {"material_request": context.material_request}, False),
+        ("update_material_request_status", f"{po}.update_material_request_status", {}, True),
+        ("get_suppliers", f"{po}.get_suppliers", {}, False),
+        ("create_from_material_request", f"{po}.create_from_material_request",
+            {"material_request": context.material_request, "supplier": context.supplier}, True),
+        ("get_po_summary_for_requests", f"{po}.get_po_summary_for_requests",
+            {"material_requests": context.material_requests}, False),
+        ("get_po_summary_for_requests:compact", f"{po}.get_po_summary_for_requests",
+            {"material_requests": context.material_requests, "compact": 1}, False),
+        ("create_from_selected_items", f"{po}.create_from_selected_items",
+            {"selected_items": context.selected_items, "supplier": context.supplier}, True),
+        ("create_from_selected_items:by_supplier", f"{po}.create_from_selected_items",
+            {"selected_items": context.selected_items, "strategy": "by_supplier"}, True),
+        ("get_dashboard_data", f"{dashboard}.get_dashboard_data", {}, False),
+        ("get_material_requests_by_status", f"{dashboard}.get_material_requests_by_status", {}, False),
+        ("get_material_requests_by_status:pending", f"{dashboard}.get_material_requests_by_status",
+            {"status": "pending"}, False),
+        ("batch:request_detail", "material_requisition.api.batch", {"calls": [
+            {"method": f"{mr}.get_request_detail", "args": {"request_name": context.material_request}},
+            {"method": f"{po}.get_suppliers"},
+            {"method": f"{po}.get_purchase_order_status", "args": {"material_request": context.material_request}},
+        ]}, False),
+    ]
+
+def get_uncovered_endpoints(cases):
+    """Whitelisted methods of API_MODULES that no benchmark case calls"""
+
+    for module in API_MODULES:
+        frappe.get_module(module)
+
+    covered = {method for _, method, _, _ in cases}
+    return sorted(
+        f"{fn.__module__}.{fn.__name__}"
+        for fn in frappe.whitelisted
+        if fn.__module__ in API_MODULES and f"{fn.__module__}.{fn.__name__}" not in covered
+    )
+
+def get_payload_size(result):
+    """Size in bytes of a result as it would be sent to the client"""
+    if hasattr(result, "get_data"):
+        return len(result.get_data())
+    return len(frappe.as_json(result).encode())
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+def run_case(method, kwargs, iterations, writes=False):
+    """Call one endpoint repeatedly and summarise latency and query counts
+
+    Write cases run with frappe.db.commit turned into a no-op, so endpoints that
+    commit internally (chunked bulk creation) are rolled back like the others and
+    repeated runs see the same data.
+    """
+
+    fn = frappe.get_attr(method)
+    timings, query_counts, db_times, rows, payload_sizes = [], [], [], [], []
+    errors = 0
+
+    for _ in range(iterations):
+        # Each call starts with cold request-level caches, as in a real request
+        frappe.local.promep_defaults = {}
+        frappe.local.response = frappe._dict({"docs": []})
+
+        db = frappe.db
+        commit = db.commit
+        if writes:
+            db.commit = lambda *args, **kwargs: None
+
+        start = time.perf_counter()
+        try:
+            with QueryRecorder() as recorder:
+                result = fn(**json.loads(json.dumps(kwargs)))
+            payload_sizes.append(get_payload_size(result))
+        except Exception:
+            errors += 1
+            frappe.clear_messages()
+        finally:
+            timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(recorder.count)
+            db_times.append(recorder.db_time * 1000)
+            rows.append(recorder.rows)
+            if writes:
+                db.commit = commit
+                db.rollback()
+
+    return {
+        "method": method,
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(timings, 0.5), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "mean_ms": round(sum(timings) / len(timings), 3),
+        "db_p50_ms": round(percentile(db_times, 0.5), 3),
+        "queries_p50": percentile(query_counts, 0.5),
+        "queries_max": max(query_counts),
+        "rows_p50": percentile(rows, 0.5),
+        "payload_bytes_p50": percentile(payload_sizes, 0.5),
+    }
+
+def get_git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=frappe.get_app_path("material_requisition", ".."),
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+def run_benchmark(iterations=DEFAULT_ITERATIONS, include_writes=False, only=None, echo=print):
+    """Benchmark every API endpoint against the current site's data
+
+    Write endpoints only run with ``include_writes``, with commits suppressed, and
+    are rolled back after each call, so they leave no documents behind. ``only`` restricts the run to case names containing it.
+    Returns a JSON-serialisable report that can be compared across commits.
+    """
+
+    cases = get_benchmark_cases(get_benchmark_context())
+    results = {}
+    for case, method, kwargs, writes in cases:
+        if (writes and not include_writes) or (only and only not in case):
+            continue
+
+        results[case] = run_case(method, kwargs, iterations, writes)
+        echo(f"{case}: p50 {results[case]['p50_ms']} ms, p95 {results[case]['p95_ms']} ms, "
+             f"{results[case]['queries_p50']} queries")
+
+    return {
+        "site": frappe.local.site,
+        "commit": get_git_commit(),
+        "timestamp": frappe.utils.now(),
+        "iterations": iterations,
+        "data_volume": {
+            doctype: frappe.db.count(doctype)
+            for doctype in ("Item", "Supplier", "Material Request", "Material Request Item", "Purchase Order")
+        },
+        "uncovered_endpoints": get_uncovered_endpoints(cases),
+        "results": results,
+    }
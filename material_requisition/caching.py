@@ -0,0 +1,32 @@
+import pickle
+
+import frappe
+
+
+def get_cached_values(keys):
+    """Read many keys written with frappe.cache.set_value in one round trip
+
+    Returns a dict of key -> value for the keys that are cached and not expired.
+    """
+
+    keys = list(keys)
+    if not keys:
+        return {}
+
+    # mget bypasses RedisWrapper, so keys are namespaced and values unpickled here
+    values = frappe.cache.mget([frappe.cache.make_key(key) for key in keys])
+    return {key: pickle.loads(value) for key, value in zip(keys, values, strict=True) if value is not None}
+
+def get_cached_hash_values(name, fields):
+    """Read many fields of a hash written with frappe.cache.hset in one round trip
+
+    Returns a dict of field -> value for the fields that are cached.
+    """
+
+    fields = list(fields)
+    if not fields:
+        return {}
+
+    # hmget bypasses RedisWrapper as well, so the hash name is namespaced here
+    values = frappe.cache.hmget(frappe.cache.make_key(name), fields)
+    return {field: pickle.loads(value) for field, value in zip(fields, values, strict=True) if value is not None}
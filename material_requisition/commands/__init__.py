@@ -1 +1,16 @@
 # Commands module
+from material_requisition.commands.benchmark import commands as benchmark_commands
+from material_requisition.commands.db_indexes import commands as db_index_commands
+from material_requisition.commands.instrumentation import commands as instrumentation_commands
+from material_requisition.commands.line_item_index import commands as line_item_index_commands
+from material_requisition.commands.setup_demo import commands as setup_demo_commands
+from material_requisition.commands.thumbnails import commands as thumbnail_commands
+
+commands = (
+    setup_demo_commands
+    + line_item_index_commands
+    + thumbnail_commands
+    + benchmark_commands
+    + instrumentation_commands
+    + db_index_commands
+)
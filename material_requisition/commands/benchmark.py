@@ -0,0 +1,47 @@
+import json
+
+import click
+import frappe
+from frappe.commands import pass_context
+
+@click.command('run-material-requisition-benchmark')
+@click.option('--iterations', default=20, help='Calls per endpoint')
+@click.option('--include-writes', is_flag=True, default=False, help='Also benchmark endpoints that create documents')
+@click.option('--only', default=None, help='Only run cases whose name contains this text')
+@click.option('--output', default=None, help='Write the JSON report to this file')
+@pass_context
+def run_benchmark(context, iterations, include_writes, only, output):
+    """Measure p50/p95 latency and SQL query counts of every API endpoint"""
+
+    site = context.sites[0] if context.sites else None
+    if not site:
+        click.echo("Please specify a site")
+        return
+
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        from material_requisition.benchmark import run_benchmark
+
+        frappe.set_user("Administrator")
+        report = run_benchmark(iterations=iterations, include_writes=include_writes, only=only, echo=click.echo)
+
+        if report["uncovered_endpoints"]:
+            click.echo(f"Endpoints without a benchmark case: {', '.join(report['uncovered_endpoints'])}")
+
+        if output:
+            with open(output, "w") as f:
+                json.dump(report, f, indent=2, default=str)
+            click.echo(f"Benchmark report written to {output}")
+        else:
+            click.echo(json.dumps(report, indent=2, default=str))
+
+    except Exception as e:
+        frappe.db.rollback()
+        click.echo(f"Error running benchmark: {str(e)}")
+        raise
+    finally:
+        frappe.destroy()
+
+commands = [run_benchmark]
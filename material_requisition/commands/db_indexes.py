@@ -0,0 +1,48 @@
+import json
+
+import click
+import frappe
+from frappe.commands import pass_context
+
+@click.command('check-material-requisition-indexes')
+@click.option('--explain/--no-explain', default=True, help='EXPLAIN the queries of every read endpoint')
+@click.option('--verbose', is_flag=True, default=False, help='Print full query plans, not only full scans')
+@pass_context
+def check_indexes(context, explain, verbose):
+    """Report missing hot query indexes and endpoint query plans"""
+
+    site = context.sites[0] if context.sites else None
+    if not site:
+        click.echo("Please specify a site")
+        return
+
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        from material_requisition.db_indexes import HOT_QUERY_INDEXES, explain_endpoint_queries, get_missing_indexes
+
+        missing = get_missing_indexes()
+        click.echo(f"{len(HOT_QUERY_INDEXES) - len(missing)} of {len(HOT_QUERY_INDEXES)} hot query indexes present")
+        for doctype, index_name, columns in missing:
+            click.echo(f"  missing: `tab{doctype}` ({', '.join(columns)}) as {index_name}")
+        if missing:
+            click.echo("Run bench migrate to add them")
+
+        if explain:
+            frappe.set_user("Administrator")
+            for entry in explain_endpoint_queries(echo=click.echo):
+                if entry["full_scans"]:
+                    click.echo(f"\n{entry['case']}: full scan of {', '.join(entry['full_scans'])}")
+                    click.echo(f"  {' '.join(entry['query'].split())[:300]}")
+                elif verbose:
+                    click.echo(f"\n{entry['case']}: {' '.join(entry['query'].split())[:300]}")
+
+                if verbose:
+                    for row in entry["plan"]:
+                        click.echo(f"  {json.dumps(row, default=str)}")
+
+    finally:
+        frappe.destroy()
+
+commands = [check_indexes]
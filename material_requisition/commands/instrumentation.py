@@ -0,0 +1,62 @@
+import json
+
+import click
+import frappe
+from frappe.commands import pass_context
+
+@click.command('show-api-stats')
+@click.option('--limit', default=20, help='Recent calls to show')
+@click.option('--method', default=None, help='Only show recent calls of this method')
+@click.option('--slow', is_flag=True, default=False, help='Show sampled slow calls with their SQL')
+@click.option('--json', 'as_json', is_flag=True, default=False, help='Print the raw statistics as JSON')
+@pass_context
+def show_api_stats(context, limit, method, slow, as_json):
+    """Show per-endpoint latency and SQL query statistics of recent API calls"""
+
+    site = context.sites[0] if context.sites else None
+    if not site:
+        click.echo("Please specify a site")
+        return
+
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        from material_requisition.instrumentation import get_call_summary, get_recent_calls, get_slow_calls
+
+        summary = get_call_summary()
+        recent_calls = get_recent_calls(limit, method)
+        slow_calls = get_slow_calls() if slow else []
+
+        if as_json:
+            click.echo(json.dumps({
+                "summary": summary,
+                "recent_calls": recent_calls,
+                "slow_calls": slow_calls
+            }, indent=2, default=str))
+            return
+
+        click.echo(f"{'method':<70} {'calls':>6} {'p50 ms':>9} {'p95 ms':>9} {'db ms':>8} {'queries':>8} {'max q':>6}")
+        for row in summary:
+            click.echo(
+                f"{row['method']:<70} {row['calls']:>6} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+                f"{row['avg_db_ms']:>8} {row['avg_queries']:>8} {row['max_queries']:>6}"
+            )
+
+        if method:
+            click.echo("")
+            for call in recent_calls:
+                click.echo(
+                    f"{call['timestamp']} {call['wall_ms']} ms, {call['queries']} queries, "
+                    f"{call['rows']} rows, {call['payload_bytes']} bytes"
+                )
+
+        for call in slow_calls:
+            click.echo(f"\n{call['timestamp']} {call['method']}: {call['wall_ms']} ms, {call['queries']} queries")
+            for query in call["sql"][:10]:
+                click.echo(f"  {query['duration']} ms  {' '.join(query['query'].split())[:200]}")
+
+    finally:
+        frappe.destroy()
+
+commands = [show_api_stats]
@@ -0,0 +1,33 @@
+import click
+import frappe
+from frappe.commands import pass_context
+
+@click.command('rebuild-line-item-index')
+@click.option('--chunk-size', default=500, help='Material requests rebuilt per commit')
+@pass_context
+def rebuild_line_item_index(context, chunk_size):
+    """Rebuild the ProMEP Line Item read model from submitted material requests"""
+
+    site = context.sites[0] if context.sites else None
+    if not site:
+        click.echo("Please specify a site")
+        return
+
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        from material_requisition.line_item_index import rebuild_line_item_index
+
+        click.echo("Rebuilding line item index...")
+        rebuilt = rebuild_line_item_index(chunk_size=chunk_size)
+        click.echo(f"Line item index rebuilt for {rebuilt} material requests")
+
+    except Exception as e:
+        frappe.db.rollback()
+        click.echo(f"Error rebuilding line item index: {str(e)}")
+        raise
+    finally:
+        frappe.destroy()
+
+commands = [rebuild_line_item_index]
@@ -3,9 +3,19 @@ import frappe
 from frappe.commands import pass_context
 
 @click.command('setup-material-requisition-demo')
+@click.option('--items', type=int, default=0, help='Synthetic items to generate in bulk')
+@click.option('--suppliers', type=int, default=0, help='Synthetic suppliers to generate in bulk')
+@click.option('--mr-lines', type=int, default=0, help='Synthetic material request lines to generate in bulk')
+@click.option('--purchase-orders', type=int, default=0, help='Synthetic purchase orders to generate in bulk')
+@click.option('--seed', type=int, default=42, help='Random seed for the synthetic data')
 @pass_context
-def setup_demo(context):
-    """Setup demo data for Material Requisition System"""
+def setup_demo(context, items, suppliers, mr_lines, purchase_orders, seed):
+    """Setup demo data for Material Requisition System
+
+    With any of the volume options, a large synthetic data set is generated on top
+    of the sample items, e.g. --items 50000 --suppliers 5000 --mr-lines 500000
+    --purchase-orders 100000.
+    """
     
     site = context.sites[0] if context.sites else None
     if not site:
@@ -25,6 +35,24 @@ def setup_demo(context):
         create_sample_suppliers()
         
         frappe.db.commit()
+        
+        if items or suppliers or mr_lines or purchase_orders:
+            from material_requisition.fixtures.synthetic_data import generate_synthetic_data
+            
+            if mr_lines and not items:
+                click.echo("--mr-lines needs --items to pick from")
+                return
+            
+            click.echo("Generating synthetic data...")
+            generate_synthetic_data(
+                items=items,
+                suppliers=suppliers,
+                mr_lines=mr_lines,
+                purchase_orders=purchase_orders,
+                seed=seed,
+                echo=click.echo
+            )
+        
         click.echo("Demo data setup completed successfully!")
         
     except Exception as e:
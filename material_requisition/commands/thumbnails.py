@@ -0,0 +1,32 @@
+import click
+import frappe
+from frappe.commands import pass_context
+
+@click.command('backfill-item-thumbnails')
+@click.option('--processes', type=int, default=None, help='Worker processes (defaults to CPU count)')
+@pass_context
+def backfill_item_thumbnails(context, processes):
+    """Generate thumbnails for every item image in the catalog"""
+
+    site = context.sites[0] if context.sites else None
+    if not site:
+        click.echo("Please specify a site")
+        return
+
+    frappe.init(site=site)
+    frappe.connect()
+
+    try:
+        from material_requisition.thumbnails import backfill_thumbnails
+
+        click.echo("Generating item thumbnails...")
+        generated = backfill_thumbnails(processes=processes)
+        click.echo(f"Thumbnails ready for {generated} images")
+
+    except Exception as e:
+        click.echo(f"Error generating thumbnails: {str(e)}")
+        raise
+    finally:
+        frappe.destroy()
+
+commands = [backfill_item_thumbnails]
@@ -0,0 +1,110 @@
+import frappe
+
+# Composite indexes backing the app's hot query shapes, as (doctype, index name, columns)
+HOT_QUERY_INDEXES = [
+    # MR -> PO links (load_purchase_orders) and the status sync dirty-request scan
+    ("Purchase Order Item", "promep_material_request", ["material_request"]),
+    ("Purchase Receipt Item", "promep_material_request", ["material_request"]),
+    # Newest-first request lists filtered to submitted documents (dashboard, status pages)
+    ("Material Request", "promep_docstatus_creation", ["docstatus", "creation"]),
+    # Status filters of get_material_requests_by_status and counter reconciliation
+    ("Material Request", "promep_docstatus_progress", ["docstatus", "per_ordered", "per_received"]),
+    # Supplier lookups per item (get_suppliers_for_items, line item index, preferred suppliers)
+    ("Item Supplier", "promep_parent", ["parent"]),
+    # Joins and refreshes of the read model by material request (get_pending_material_requests)
+    ("ProMEP Line Item", "promep_material_request", ["material_request", "idx"]),
+    # Newest-first pages of requests with open lines (get_pending_material_requests)
+    ("ProMEP Line Item", "promep_pending_requests",
+        ["material_request_type", "request_creation", "material_request", "per_ordered"]),
+]
+
+def get_table_indexes(doctype):
+    """Map of index name -> ordered list of columns for a doctype's table"""
+
+    indexes = {}
+    for row in frappe.db.sql(f"SHOW INDEX FROM `tab{doctype}`", as_dict=True):
+        indexes.setdefault(row.Key_name, []).append((row.Seq_in_index, row.Column_name))
+
+    return {name: [column for _, column in sorted(columns)] for name, columns in indexes.items()}
+
+def has_covering_index(doctype, columns):
+    """Whether some index of the table starts with the given columns, in order"""
+    return any(
+        index_columns[:len(columns)] == list(columns)
+        for index_columns in get_table_indexes(doctype).values()
+    )
+
+def get_missing_indexes():
+    """HOT_QUERY_INDEXES entries without an index that starts with their columns"""
+    return [
+        (doctype, index_name, columns)
+        for doctype, index_name, columns in HOT_QUERY_INDEXES
+        if not has_covering_index(doctype, columns)
+    ]
+
+def add_index_online(doctype, index_name, columns):
+    """Add an index without blocking writes where MariaDB supports it
+
+    ALGORITHM=INPLACE, LOCK=NONE keeps the table readable and writable while the
+    index is built. Servers or tables that cannot do that fall back to a plain
+    ALTER TABLE.
+    """
+
+    column_list = ", ".join(f"`{column}`" for column in columns)
+    statement = f"ALTER TABLE `tab{doctype}` ADD INDEX `{index_name}` ({column_list})"
+    try:
+        frappe.db.sql_ddl(f"{statement}, ALGORITHM=INPLACE, LOCK=NONE")
+    except Exception as e:
+        frappe.log_error(f"Online Index Build Error for {doctype}.{index_name}: {str(e)}")
+        frappe.db.sql_ddl(statement)
+
+def ensure_hot_query_indexes():
+    """Create every missing hot query index and return the ones that were added"""
+
+    missing = get_missing_indexes()
+    for doctype, index_name, columns in missing:
+        add_index_online(doctype, index_name, columns)
+
+    return missing
+
+def explain_endpoint_queries(echo=print):
+    """Run every read endpoint once and EXPLAIN the SELECT statements it issues
+
+    Returns a list of {case, query, plan, full_scans}, where full_scans lists the
+    tables read without an index.
+    """
+
+    from material_requisition.benchmark import get_benchmark_cases, get_benchmark_context
+    from material_requisition.query_stats import QueryRecorder
+
+    report = []
+    for case, method, kwargs, writes in get_benchmark_cases(get_benchmark_context()):
+        if writes:
+            continue
+
+        try:
+            with QueryRecorder(keep_queries=True) as recorder:
+                frappe.get_attr(method)(**kwargs)
+        except Exception as e:
+            echo(f"{case}: failed to run ({str(e)})")
+            continue
+
+        queries = dict.fromkeys(
+            query["query"] for query in recorder.queries
+            if query["query"].lstrip().upper().startswith("SELECT")
+        )
+        for query in queries:
+            try:
+                plan = frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+            except Exception as e:
+                echo(f"{case}: could not explain query ({str(e)})")
+                continue
+
+            report.append({
+                "case": case,
+                "query": query,
+                "plan": plan,
+                "full_scans": [row.table for row in plan if row.type == "ALL" and row.table],
+            })
+
+    return report
@@ -0,0 +1,93 @@
+import frappe
+
+from material_requisition.caching import get_cached_hash_values
+
+# Shared caches, invalidated by Company, Warehouse and Item events
+DEFAULT_WAREHOUSE_CACHE_KEY = "promep_default_warehouse"
+STOCK_UOM_CACHE_KEY = "promep_stock_uom"
+
+FALLBACK_UOM = "Nos"
+
+def get_request_cache():
+    """Dict memoizing resolved defaults for the lifetime of the current request or job"""
+    if not hasattr(frappe.local, "promep_defaults"):
+        frappe.local.promep_defaults = {}
+    return frappe.local.promep_defaults
+
+def get_default_company():
+    """Default company of the current user"""
+
+    cache = get_request_cache()
+    if "company" not in cache:
+        cache["company"] = frappe.defaults.get_user_default("Company")
+    return cache["company"]
+
+def get_default_warehouse(company=None):
+    """Get default warehouse for material requests and purchase orders
+
+    Uses the company's default warehouse when it has one, otherwise the first
+    non-group warehouse of the company (or of any company).
+    """
+
+    company = company or get_default_company()
+    cache = get_request_cache()
+    request_key = ("warehouse", company)
+    if request_key in cache:
+        return cache[request_key]
+
+    warehouse = frappe.cache.hget(DEFAULT_WAREHOUSE_CACHE_KEY, company or "")
+    if warehouse is None:
+        warehouse = resolve_default_warehouse(company) or ""
+        frappe.cache.hset(DEFAULT_WAREHOUSE_CACHE_KEY, company or "", warehouse)
+
+    cache[request_key] = warehouse or None
+    return cache[request_key]
+
+def resolve_default_warehouse(company=None):
+    """Look up the default warehouse without any caching"""
+    try:
+        # Try to get from company settings
+        if company and frappe.get_meta("Company").has_field("default_warehouse"):
+            warehouse = frappe.db.get_value("Company", company, "default_warehouse")
+            if warehouse:
+                return warehouse
+
+        # Fallback to first available warehouse
+        filters = {"is_group": 0, "disabled": 0}
+        if company:
+            filters["company"] = company
+        warehouse = frappe.get_all("Warehouse", filters=filters, limit=1, pluck="name")
+        if not warehouse and company:
+            warehouse = frappe.get_all("Warehouse", filters={"is_group": 0, "disabled": 0}, limit=1, pluck="name")
+
+        return warehouse[0] if warehouse else None
+
+    except Exception:
+        return None
+
+def get_stock_uoms(item_codes):
+    """Map item codes to their stock UOM with one cache read and one query for unknown items"""
+
+    item_codes = [code for code in dict.fromkeys(item_codes) if code]
+    cache = get_request_cache().setdefault("stock_uom", {})
+
+    missing = [code for code in item_codes if code not in cache]
+    cache.update(get_cached_hash_values(STOCK_UOM_CACHE_KEY, missing))
+
+    missing = [code for code in missing if code not in cache]
+    if missing:
+        for item in frappe.get_all("Item", filters={"name": ["in", missing]}, fields=["name", "stock_uom"]):
+            cache[item.name] = item.stock_uom
+            frappe.cache.hset(STOCK_UOM_CACHE_KEY, item.name, item.stock_uom)
+
+    return {code: cache.get(code) or FALLBACK_UOM for code in item_codes}
+
+def clear_warehouse_defaults(doc=None, method=None):
+    """doc_events handler for Company and Warehouse changes"""
+    frappe.cache.delete_value(DEFAULT_WAREHOUSE_CACHE_KEY)
+    get_request_cache().clear()
+
+def clear_stock_uom(doc, method=None):
+    """doc_events handler for Item changes"""
+    frappe.cache.hdel(STOCK_UOM_CACHE_KEY, doc.name)
+    get_request_cache().get("stock_uom", {}).pop(doc.name, None)
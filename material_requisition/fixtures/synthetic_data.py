@@ -0,0 +1,208 @@
+import random
+from collections import namedtuple
+
+import frappe
+from frappe.utils import add_days, getdate, now, today
+
+from material_requisition.defaults import get_default_company, get_default_warehouse
+
+# Prefix of every generated document name, so the data set can be found and removed
+SYNTHETIC_PREFIX = "SYN"
+
+BULK_INSERT_CHUNK_SIZE = 5000
+
+ITEM_GROUP = "All Item Groups"
+SUPPLIER_GROUP = "All Supplier Groups"
+UOM = "Nos"
+
+# Share of the material request lines that the generated purchase orders cover
+ORDERED_LINE_SHARE = 0.6
+
+ITEM_WORDS = [
+    "Pipe", "Elbow", "Tee", "Valve", "Cable", "Wire", "Screw", "Bolt", "Nut", "Anchor",
+    "Bracket", "Panel", "Helmet", "Glove", "Cement", "Rebar", "Sand", "Gravel", "Brick", "Tile"
+]
+ITEM_MATERIALS = ["PVC", "Copper", "Steel", "Brass", "Galvanized", "Aluminium", "HDPE", "Concrete"]
+
+STANDARD_FIELDS = ["name", "creation", "modified", "modified_by", "owner", "docstatus", "idx"]
+CHILD_FIELDS = ["parent", "parenttype", "parentfield"]
+
+# Tuples rather than dicts keep half a million generated lines affordable in memory
+Line = namedtuple("Line", ["name", "parent", "idx", "item_code", "qty", "rate", "ordered", "schedule_date"])
+
+def get_standard_values(name, creation, idx=0, docstatus=0):
+    return [name, creation, creation, "Administrator", "Administrator", docstatus, idx]
+
+def bulk_insert(doctype, fields, rows, commit=True):
+    """Insert generated rows with multi-row INSERT statements, skipping existing names"""
+    frappe.db.bulk_insert(doctype, fields, rows, ignore_duplicates=True, chunk_size=BULK_INSERT_CHUNK_SIZE)
+    if commit:
+        frappe.db.commit()
+
+def generate_synthetic_data(items=50000, suppliers=5000, mr_lines=500000, purchase_orders=100000,
+                            lines_per_request=10, company=None, seed=42, echo=print, commit=True):
+    """Generate a large, deterministic data set for scale testing
+
+    Documents are written straight to their tables in bulk rather than through
+    ``insert()``, so no validations or doc events run. Material requests and
+    purchase orders are created submitted, and ordered quantities on the covered
+    request lines match the purchase orders. The line item read model and status
+    counters are rebuilt at the end. Re-running with the same volumes is a no-op.
+    ``commit=False`` leaves everything in the current transaction, so a test can
+    roll the data set back.
+    """
+
+    rng = random.Random(seed)
+    company = company or get_default_company() or frappe.get_all("Company", limit=1, pluck="name")[0]
+    warehouse = get_default_warehouse(company)
+    currency = frappe.get_cached_value("Company", company, "default_currency")
+    creation = now()
+    base_date = getdate(today())
+
+    item_codes = [f"{SYNTHETIC_PREFIX}-ITEM-{i:06d}" for i in range(1, items + 1)]
+    supplier_names = [f"{SYNTHETIC_PREFIX}-SUP-{i:05d}" for i in range(1, suppliers + 1)]
+
+    echo(f"Inserting {items} items...")
+    item_names = {}
+    def item_rows():
+        for code in item_codes:
+            item_name = f"{rng.choice(ITEM_MATERIALS)} {rng.choice(ITEM_WORDS)} {code[-6:]}"
+            item_names[code] = item_name
+            yield [*get_standard_values(code, creation),
+                code, item_name, item_name, ITEM_GROUP, UOM, 1, 0, 0
+            ]
+
+    bulk_insert("Item", [*STANDARD_FIELDS,
+        "item_code", "item_name", "description", "item_group", "stock_uom", "is_stock_item",
+        "disabled", "include_item_in_manufacturing"
+    ], item_rows(), commit=commit)
+
+    echo(f"Inserting {suppliers} suppliers...")
+    bulk_insert("Supplier", [*STANDARD_FIELDS, "supplier_name", "supplier_group", "supplier_type"], (
+        [*get_standard_values(name, creation), name, SUPPLIER_GROUP, "Company"]
+        for name in supplier_names
+    ), commit=commit)
+
+    if supplier_names:
+        echo("Linking items to suppliers...")
+        bulk_insert("Item Supplier", [*STANDARD_FIELDS, *CHILD_FIELDS, "supplier"], (
+            [*get_standard_values(f"{code}-S{idx}", creation, idx), code, "Item", "supplier_items", supplier]
+            for code in item_codes
+            for idx, supplier in enumerate(rng.sample(supplier_names, min(2, len(supplier_names))), 1)
+        ), commit=commit)
+
+    # Lines are laid out request by request; the first ORDERED_LINE_SHARE of them are
+    # split across the purchase orders
+    requests = -(-mr_lines // lines_per_request) if mr_lines else 0
+    ordered_lines = int(mr_lines * ORDERED_LINE_SHARE) if purchase_orders and supplier_names else 0
+    lines_per_order = max(-(-ordered_lines // purchase_orders), 1) if ordered_lines else 0
+    purchase_orders = -(-ordered_lines // lines_per_order) if ordered_lines else 0
+
+    lines = []
+    for line_index in range(mr_lines):
+        request_index = line_index // lines_per_request
+        item_code = rng.choice(item_codes)
+        lines.append(Line(
+            name=f"{SYNTHETIC_PREFIX}-MRI-{line_index + 1:07d}",
+            parent=f"{SYNTHETIC_PREFIX}-MR-{request_index + 1:06d}",
+            idx=line_index % lines_per_request + 1,
+            item_code=item_code,
+            qty=rng.randint(1, 100),
+            rate=rng.randint(1, 500),
+            ordered=line_index < ordered_lines,
+            schedule_date=add_days(base_date, request_index % 90)
+        ))
+
+    echo(f"Inserting {requests} material requests with {mr_lines} lines...")
+    def request_rows():
+        for request_index in range(requests):
+            request_lines = lines[request_index * lines_per_request:(request_index + 1) * lines_per_request]
+            total_qty = sum(line.qty for line in request_lines)
+            per_ordered = 100 * sum(line.qty for line in request_lines if line.ordered) / total_qty
+            status = "Ordered" if per_ordered >= 100 else ("Partially Ordered" if per_ordered else "Pending")
+            yield [*get_standard_values(f"{SYNTHETIC_PREFIX}-MR-{request_index + 1:06d}", creation, docstatus=1),
+                "Purchase", company, add_days(base_date, -(request_index % 365)), request_lines[0].schedule_date,
+                status, per_ordered, 0, total_qty, f"Synthetic Request {request_index + 1}"
+            ]
+
+    bulk_insert("Material Request", [*STANDARD_FIELDS,
+        "material_request_type", "company", "transaction_date", "schedule_date",
+        "status", "per_ordered", "per_received", "total_qty", "title"
+    ], request_rows(), commit=commit)
+
+    bulk_insert("Material Request Item", [*STANDARD_FIELDS, *CHILD_FIELDS,
+        "item_code", "item_name", "description", "qty", "stock_qty", "uom", "stock_uom",
+        "conversion_factor", "rate", "amount", "ordered_qty", "received_qty", "schedule_date", "warehouse"
+    ], (
+        [*get_standard_values(line.name, creation, line.idx, docstatus=1),
+            line.parent, "Material Request", "items",
+            line.item_code, item_names[line.item_code], item_names[line.item_code],
+            line.qty, line.qty, UOM, UOM, 1, line.rate, line.qty * line.rate,
+            line.qty if line.ordered else 0, 0, line.schedule_date, warehouse
+        ]
+        for line in lines
+    ), commit=commit)
+
+    echo(f"Inserting {purchase_orders} purchase orders...")
+    order_suppliers = [rng.choice(supplier_names) for _ in range(purchase_orders)] if purchase_orders else []
+    def order_lines(order_index):
+        return lines[order_index * lines_per_order:min((order_index + 1) * lines_per_order, ordered_lines)]
+
+    def order_rows():
+        for order_index in range(purchase_orders):
+            grand_total = sum(line.qty * line.rate for line in order_lines(order_index))
+            total_qty = sum(line.qty for line in order_lines(order_index))
+            yield [*get_standard_values(f"{SYNTHETIC_PREFIX}-PO-{order_index + 1:06d}", creation, docstatus=1),
+                order_suppliers[order_index], order_suppliers[order_index], company, currency, 1,
+                add_days(base_date, -(order_index % 365)), add_days(base_date, 14), "To Receive and Bill",
+                0, total_qty, grand_total, grand_total
+            ]
+
+    bulk_insert("Purchase Order", [*STANDARD_FIELDS,
+        "supplier", "supplier_name", "company", "currency", "conversion_rate",
+        "transaction_date", "schedule_date", "status", "per_received", "total_qty",
+        "grand_total", "base_grand_total"
+    ], order_rows(), commit=commit)
+
+    bulk_insert("Purchase Order Item", [*STANDARD_FIELDS, *CHILD_FIELDS,
+        "item_code", "item_name", "description", "qty", "stock_qty", "uom", "stock_uom",
+        "conversion_factor", "rate", "base_rate", "amount", "base_amount", "schedule_date",
+        "warehouse", "material_request", "material_request_item"
+    ], (
+        [*get_standard_values(f"{SYNTHETIC_PREFIX}-POI-{line_index + 1:07d}", creation,
+                              line_index % lines_per_order + 1, docstatus=1),
+            f"{SYNTHETIC_PREFIX}-PO-{line_index // lines_per_order + 1:06d}", "Purchase Order", "items",
+            line.item_code, item_names[line.item_code], item_names[line.item_code],
+            line.qty, line.qty, UOM, UOM, 1, line.rate, line.rate, line.qty * line.rate,
+            line.qty * line.rate, add_days(base_date, 14), warehouse, line.parent, line.name
+        ]
+        for line_index, line in enumerate(lines[:ordered_lines])
+    ), commit=commit)
+
+    echo("Rebuilding line item index and clearing caches...")
+    rebuild_read_models(commit=commit)
+
+    return {
+        "items": items,
+        "suppliers": suppliers,
+        "material_requests": requests,
+        "material_request_lines": mr_lines,
+        "purchase_orders": purchase_orders
+    }
+
+def rebuild_read_models(commit=True):
+    """Bring caches and read models in line after writing tables directly"""
+
+    from material_requisition.item_catalog import clear_catalog_cache
+    from material_requisition.item_search import mark_index_stale
+    from material_requisition.line_item_index import rebuild_line_item_index
+    from material_requisition.po_links import clear_all_purchase_order_links
+    from material_requisition.supplier_preferences import clear_all_preferred_suppliers
+
+    rebuild_line_item_index(commit=commit)
+    clear_catalog_cache()
+    mark_index_stale()
+    clear_all_purchase_order_links()
+    clear_all_preferred_suppliers()
+    if commit:
+        frappe.db.commit()
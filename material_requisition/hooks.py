@@ -177,9 +177,82 @@ after_build = "material_requisition.build_hooks.after_build"
 # 	}
 # }
 
+doc_events = {
+	"Material Request": {
+		"on_submit": ["material_requisition.line_item_index.on_material_request_change"],
+		"on_cancel": ["material_requisition.line_item_index.on_material_request_change"],
+		"on_update_after_submit": ["material_requisition.line_item_index.on_material_request_change"],
+	},
+	"Purchase Order": {
+		"after_insert": ["material_requisition.po_links.on_purchase_document_change"],
+		"on_update": ["material_requisition.po_links.on_purchase_document_change"],
+		"on_submit": [
+			"material_requisition.line_item_index.on_purchase_document_change",
+			"material_requisition.po_links.on_purchase_document_change",
+		],
+		"on_cancel": [
+			"material_requisition.line_item_index.on_purchase_document_change",
+			"material_requisition.po_links.on_purchase_document_change",
+		],
+		"on_update_after_submit": ["material_requisition.po_links.on_purchase_document_change"],
+		"on_trash": ["material_requisition.po_links.on_purchase_document_change"],
+	},
+	"Purchase Receipt": {
+		"on_submit": [
+			"material_requisition.line_item_index.on_purchase_document_change",
+			"material_requisition.po_links.on_purchase_document_change",
+		],
+		"on_cancel": [
+			"material_requisition.line_item_index.on_purchase_document_change",
+			"material_requisition.po_links.on_purchase_document_change",
+		],
+	},
+	"Item": {
+		"after_insert": [
+			"material_requisition.item_catalog.clear_catalog_cache",
+			"material_requisition.item_search.mark_index_stale",
+			"material_requisition.thumbnails.on_item_update",
+		],
+		"on_update": [
+			"material_requisition.line_item_index.on_item_update",
+			"material_requisition.item_catalog.clear_catalog_cache",
+			"material_requisition.item_search.mark_index_stale",
+			"material_requisition.thumbnails.on_item_update",
+			"material_requisition.defaults.clear_stock_uom",
+			"material_requisition.supplier_preferences.clear_preferred_supplier",
+		],
+		"on_trash": [
+			"material_requisition.item_catalog.clear_catalog_cache",
+			"material_requisition.item_search.mark_index_stale",
+			"material_requisition.defaults.clear_stock_uom",
+			"material_requisition.supplier_preferences.clear_preferred_supplier",
+		],
+	},
+	"Company": {
+		"on_update": ["material_requisition.defaults.clear_warehouse_defaults"],
+	},
+	"Warehouse": {
+		"after_insert": ["material_requisition.defaults.clear_warehouse_defaults"],
+		"on_update": ["material_requisition.defaults.clear_warehouse_defaults"],
+		"on_trash": ["material_requisition.defaults.clear_warehouse_defaults"],
+	},
+}
+
+# Cache keys kept by clear-cache and migrate; the thumbnail map is expensive to rebuild
+persistent_cache_keys = ["promep_item_thumbnails*"]
+
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"hourly": [
+		"material_requisition.status_counters.reconcile_status_counters"
+	],
+	"hourly_long": [
+		"material_requisition.status_sync.sync_material_request_statuses"
+	],
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"material_requisition.tasks.all"
@@ -228,8 +301,8 @@ after_build = "material_requisition.build_hooks.after_build"
 
 # Request Events
 # ----------------
-# before_request = ["material_requisition.utils.before_request"]
-# after_request = ["material_requisition.utils.after_request"]
+before_request = ["material_requisition.instrumentation.before_request"]
+after_request = ["material_requisition.instrumentation.after_request"]
 
 # Job Events
 # ----------
@@ -0,0 +1,94 @@
+import functools
+import hashlib
+import json
+
+import frappe
+from frappe import _
+
+# Results of idempotent calls are replayed for a day
+IDEMPOTENCY_TTL = 24 * 60 * 60
+
+# How long a call holds its key while it is still running
+IDEMPOTENCY_LOCK_TTL = 5 * 60
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+class IdempotencyConflictError(frappe.ValidationError):
+    http_status_code = 409
+
+def get_idempotency_key():
+    """Idempotency key sent by the client as a header or an ``idempotency_key`` parameter
+
+    Calls run by api.batch use only their own ``idempotency_key`` argument, set in
+    ``frappe.flags.promep_idempotency_key``, and never the batch request's key.
+    """
+
+    if "promep_idempotency_key" in frappe.flags:
+        return frappe.flags.promep_idempotency_key
+
+    return frappe.get_request_header(IDEMPOTENCY_HEADER) or (frappe.form_dict or {}).get("idempotency_key")
+
+def get_fingerprint(endpoint, args, kwargs):
+    """Stable hash of an endpoint call and its arguments"""
+    payload = json.dumps([endpoint, args, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def idempotent(endpoint):
+    """Replay the stored result when a call is retried with the same idempotency key
+
+    The first call with a key runs normally and its result is stored once the
+    transaction commits. Retries with the same key and arguments get that result
+    back without touching the write path. Reusing a key for different arguments,
+    or while the first call is still running, raises IdempotencyConflictError.
+    Calls without a key are not affected.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = get_idempotency_key()
+            if not key:
+                return fn(*args, **kwargs)
+
+            cache_key = f"promep_idempotency:{frappe.session.user}:{endpoint}:{key}"
+            lock_key = frappe.cache.make_key(f"{cache_key}:lock")
+            fingerprint = get_fingerprint(endpoint, args, kwargs)
+
+            stored = frappe.cache.get_value(cache_key)
+            if stored:
+                if stored["fingerprint"] != fingerprint:
+                    frappe.throw(
+                        _("Idempotency key {0} was already used for a different request").format(key),
+                        IdempotencyConflictError
+                    )
+                return stored["result"]
+
+            if not frappe.cache.set(lock_key, 1, nx=True, ex=IDEMPOTENCY_LOCK_TTL):
+                frappe.throw(
+                    _("A request with idempotency key {0} is still in progress").format(key),
+                    IdempotencyConflictError
+                )
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                frappe.cache.delete(lock_key)
+                raise
+
+            def store_result():
+                frappe.cache.set_value(
+                    cache_key,
+                    {"fingerprint": fingerprint, "result": result},
+                    expires_in_sec=IDEMPOTENCY_TTL
+                )
+                frappe.cache.delete(lock_key)
+
+            # Only remember results whose documents were actually committed
+            frappe.db.after_commit.add(store_result)
+            frappe.db.after_rollback.add(lambda: frappe.cache.delete(lock_key))
+
+            return result
+
+        return wrapper
+
+    return decorator
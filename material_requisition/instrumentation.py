@@ -0,0 +1,161 @@
+import json
+import time
+
+import frappe
+
+from material_requisition.query_stats import QueryRecorder
+
+# Redis lists used as ring buffers of recent calls and slow call samples
+API_CALLS_KEY = "promep_api_calls"
+SLOW_CALLS_KEY = "promep_api_slow_calls"
+
+API_CALLS_BUFFER_SIZE = 2000
+SLOW_CALLS_BUFFER_SIZE = 50
+
+# Calls slower than this keep their SQL; override with promep_slow_call_ms in site_config
+SLOW_CALL_MS = 1000
+
+# Statements kept per slow call sample
+MAX_SAMPLED_QUERIES = 200
+
+APP_METHOD_PREFIX = "material_requisition."
+
+def is_enabled():
+    """Instrumentation is on unless promep_api_instrumentation is 0 in site_config"""
+    return bool(frappe.conf.get("promep_api_instrumentation", 1))
+
+def get_request_method(request):
+    """Dotted path of the app method an /api/method/ request calls, or None"""
+
+    path = request.path if request else ""
+    if "/method/" not in path:
+        return None
+
+    method = path.split("/method/", 1)[1].strip("/")
+    return method if method.startswith(APP_METHOD_PREFIX) else None
+
+def start_call(method):
+    """Start recording a call; its queries are counted until finish_call"""
+
+    recorder = QueryRecorder(keep_queries=True)
+    recorder.__enter__()
+    frappe.local.promep_api_call = frappe._dict({
+        "method": method,
+        "recorder": recorder,
+        "start": time.perf_counter(),
+    })
+
+def finish_call(payload_size=None, status_code=None):
+    """Stop recording the current call and push it to the ring buffers"""
+
+    call = getattr(frappe.local, "promep_api_call", None)
+    if not call:
+        return
+
+    frappe.local.promep_api_call = None
+    call.recorder.__exit__(None, None, None)
+    record_call(
+        call.method,
+        wall_time=time.perf_counter() - call.start,
+        recorder=call.recorder,
+        payload_size=payload_size,
+        status_code=status_code
+    )
+
+def record_call(method, wall_time, recorder, payload_size=None, status_code=None):
+    """Store one call's measurements, with its SQL when it was slow"""
+
+    entry = {
+        "method": method,
+        "timestamp": frappe.utils.now(),
+        "user": frappe.session.user if getattr(frappe.local, "session", None) else None,
+        "status_code": status_code,
+        "wall_ms": round(wall_time * 1000, 3),
+        "db_ms": round(recorder.db_time * 1000, 3),
+        "queries": recorder.count,
+        "rows": recorder.rows,
+        "payload_bytes": payload_size,
+    }
+
+    try:
+        push(API_CALLS_KEY, entry, API_CALLS_BUFFER_SIZE)
+
+        if entry["wall_ms"] >= frappe.conf.get("promep_slow_call_ms", SLOW_CALL_MS):
+            slowest = sorted(recorder.queries, key=lambda query: query["duration"], reverse=True)
+            push(SLOW_CALLS_KEY, {**entry, "sql": slowest[:MAX_SAMPLED_QUERIES]}, SLOW_CALLS_BUFFER_SIZE)
+
+    except Exception as e:
+        # Never fail a request because its measurements could not be stored
+        frappe.log_error(f"Record API Call Error: {str(e)}")
+
+def push(key, entry, size):
+    frappe.cache.lpush(key, json.dumps(entry, default=str))
+    frappe.cache.ltrim(key, 0, size - 1)
+
+def read(key, limit=None):
+    entries = frappe.cache.lrange(key, 0, (limit or 0) - 1)
+    return [json.loads(frappe.safe_decode(entry)) for entry in entries or []]
+
+def before_request():
+    """before_request hook starting the measurement of app method calls"""
+    if not is_enabled():
+        return
+
+    method = get_request_method(frappe.request)
+    if method:
+        start_call(method)
+
+def after_request(response=None, request=None):
+    """after_request hook recording the call started in before_request"""
+
+    if not getattr(frappe.local, "promep_api_call", None):
+        return
+
+    payload_size = None
+    if response is not None and not response.is_streamed:
+        payload_size = response.calculate_content_length()
+
+    finish_call(payload_size, response.status_code if response is not None else None)
+
+def get_recent_calls(limit=100, method=None):
+    """Most recent calls, newest first"""
+    calls = read(API_CALLS_KEY)
+    if method:
+        calls = [call for call in calls if call["method"] == method]
+    return calls[:limit]
+
+def get_slow_calls(limit=SLOW_CALLS_BUFFER_SIZE):
+    """Sampled slow calls with their slowest SQL statements, newest first"""
+    return read(SLOW_CALLS_KEY, limit)
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def get_call_summary():
+    """Per-method aggregates over the calls in the ring buffer, slowest p95 first"""
+
+    calls_by_method = {}
+    for call in read(API_CALLS_KEY):
+        calls_by_method.setdefault(call["method"], []).append(call)
+
+    summary = []
+    for method, calls in calls_by_method.items():
+        wall_times = [call["wall_ms"] for call in calls]
+        payload_sizes = [call["payload_bytes"] for call in calls if call["payload_bytes"] is not None]
+        summary.append({
+            "method": method,
+            "calls": len(calls),
+            "p50_ms": percentile(wall_times, 0.5),
+            "p95_ms": percentile(wall_times, 0.95),
+            "avg_db_ms": round(sum(call["db_ms"] for call in calls) / len(calls), 3),
+            "avg_queries": round(sum(call["queries"] for call in calls) / len(calls), 1),
+            "max_queries": max(call["queries"] for call in calls),
+            "avg_rows": round(sum(call["rows"] for call in calls) / len(calls), 1),
+            "avg_payload_bytes": round(sum(payload_sizes) / len(payload_sizes)) if payload_sizes else None,
+        })
+
+    return sorted(summary, key=lambda row: row["p95_ms"], reverse=True)
+
+def clear_calls():
+    frappe.cache.delete_value([API_CALLS_KEY, SLOW_CALLS_KEY])
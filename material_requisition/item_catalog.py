@@ -0,0 +1,158 @@
+import hashlib
+import time
+
+import frappe
+
+from material_requisition.thumbnails import get_thumbnail_urls
+
+# Redis hashes holding the catalog per item group and the versions seen so far
+CATALOG_CACHE_KEY = "promep_item_catalog"
+CATALOG_VERSIONS_KEY = "promep_item_catalog_versions"
+
+ALL_CATEGORIES = "__all__"
+
+# Catalog versions kept for deltas; older clients get the full catalog again
+MAX_CATALOG_VERSIONS = 50
+CATALOG_VERSION_TTL = 7 * 86400
+
+CATALOG_FIELDS = [
+    "item_code",
+    "item_name",
+    "item_group",
+    "image",
+    "description",
+    "stock_uom",
+    "modified"
+]
+
+DEFAULT_ITEM_IMAGES = {
+    "Pipes": "/assets/material_requisition/images/pipe.png",
+    "Fittings": "/assets/material_requisition/images/fitting.png",
+    "Electrical": "/assets/material_requisition/images/electrical.png",
+    "Hardware": "/assets/material_requisition/images/hardware.png",
+    "Tools": "/assets/material_requisition/images/tools.png",
+    "Safety": "/assets/material_requisition/images/safety.png"
+}
+
+DEFAULT_IMAGE = "/assets/material_requisition/images/default.png"
+
+def get_default_item_image(item_group):
+    """Get default image based on item group"""
+    return DEFAULT_ITEM_IMAGES.get(item_group, DEFAULT_IMAGE)
+
+def get_catalog_filters(category=None):
+    """Item filters for the visual catalog of one item group (or all of them)"""
+    filters = {"disabled": 0, "is_stock_item": 1}
+    if category:
+        filters["item_group"] = category
+    return filters
+
+def resolve_images(items):
+    """Point items at their thumbnail, falling back to the group default image
+
+    The original image stays available as ``full_image``.
+    """
+
+    thumbnails = get_thumbnail_urls()
+    for item in items:
+        if not item.image:
+            item.image = get_default_item_image(item.item_group)
+        item.full_image = item.image
+        item.image = thumbnails.get(item.image, item.image)
+    return items
+
+def get_catalog(category=None):
+    """Get the full stock-item catalog for a category with its version hash
+
+    The catalog is built once per category and kept in the cache until an Item
+    changes. Returns a dict with ``version``, ``as_of`` and ``items``.
+    """
+
+    key = category or ALL_CATEGORIES
+    catalog = frappe.cache.hget(CATALOG_CACHE_KEY, key)
+    if catalog:
+        return catalog
+
+    items = resolve_images(frappe.get_all(
+        "Item",
+        filters=get_catalog_filters(category),
+        fields=CATALOG_FIELDS,
+        order_by="item_name"
+    ))
+
+    catalog = {
+        "version": hashlib.sha1(frappe.as_json(items).encode()).hexdigest()[:16],
+        "as_of": str(max((item.modified for item in items), default="")),
+        "items": items
+    }
+
+    frappe.cache.hset(CATALOG_CACHE_KEY, key, catalog)
+    add_catalog_version(catalog["version"], catalog["as_of"])
+
+    return catalog
+
+def add_catalog_version(version, as_of):
+    """Remember a served catalog version, pruning expired and surplus old ones
+
+    Each entry records when it was added, so versions older than
+    CATALOG_VERSION_TTL are dropped and at most MAX_CATALOG_VERSIONS are kept.
+    """
+
+    now = time.time()
+    versions = frappe.cache.hgetall(CATALOG_VERSIONS_KEY) or {}
+    versions = {frappe.safe_decode(key): entry for key, entry in versions.items()}
+
+    live = sorted(
+        (entry["added"], key) for key, entry in versions.items()
+        if is_live_version(entry, now) and key != version
+    )
+    stale = [key for key, entry in versions.items() if not is_live_version(entry, now)]
+    stale += [key for _, key in live[:max(len(live) - MAX_CATALOG_VERSIONS + 1, 0)]]
+
+    for key in stale:
+        frappe.cache.hdel(CATALOG_VERSIONS_KEY, key)
+
+    frappe.cache.hset(CATALOG_VERSIONS_KEY, version, {"as_of": as_of, "added": now})
+
+def is_live_version(entry, now=None):
+    """Whether a CATALOG_VERSIONS_KEY entry can still serve deltas"""
+    return isinstance(entry, dict) and (now or time.time()) - entry["added"] < CATALOG_VERSION_TTL
+
+def get_catalog_delta(category, since_version):
+    """Items changed since a previously served catalog version
+
+    Returns None when the version is unknown or expired (e.g. after an item was
+    deleted) and the client has to reload the full catalog.
+    """
+
+    entry = frappe.cache.hget(CATALOG_VERSIONS_KEY, since_version)
+    if not is_live_version(entry):
+        return None
+    as_of = entry["as_of"]
+
+    changed = frappe.get_all(
+        "Item",
+        filters={"modified": [">", as_of]},
+        fields=CATALOG_FIELDS + ["disabled", "is_stock_item"],
+        order_by="item_name"
+    )
+
+    # Items that left the catalog were disabled, made non-stock or moved to another group
+    updated, removed = [], []
+    for item in changed:
+        disabled, is_stock_item = item.pop("disabled"), item.pop("is_stock_item")
+        if not disabled and is_stock_item and (not category or item.item_group == category):
+            updated.append(item)
+        else:
+            removed.append(item.item_code)
+
+    return {"updated": resolve_images(updated), "removed": removed}
+
+def clear_catalog_cache(doc=None, method=None):
+    """doc_events handler invalidating the cached catalog when an Item changes"""
+
+    frappe.cache.delete_value(CATALOG_CACHE_KEY)
+
+    # A deleted item cannot be reported in a delta, so forget every version
+    if method == "on_trash":
+        frappe.cache.delete_value(CATALOG_VERSIONS_KEY)
@@ -0,0 +1,180 @@
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+import frappe
+
+from material_requisition.item_catalog import get_catalog_filters, get_default_item_image
+
+# Bumped by Item events so every worker knows its in-memory index is stale
+INDEX_VERSION_KEY = "promep_item_search_version"
+# Version at which a full rebuild is required (set when items are deleted)
+REBUILD_VERSION_KEY = "promep_item_search_rebuild_version"
+
+# Full rebuilds also refresh the requisition frequencies used for ranking
+INDEX_MAX_AGE = 3600
+
+INDEX_FIELDS = ["item_code", "item_name", "item_group", "description", "stock_uom", "image"]
+
+_indexes = {}
+_lock = threading.Lock()
+
+def tokenize(text):
+    """Split text into lowercase word tokens"""
+    return [token for token in re.split(r"[^\w]+", (text or "").lower()) if token]
+
+def get_item_tokens(item):
+    """Tokens an item can be found by: its whole code plus words of code, name and description"""
+    tokens = set(tokenize(item.item_code) + tokenize(item.item_name) + tokenize(item.description))
+    tokens.add((item.item_code or "").lower())
+    return tokens
+
+class ItemPrefixIndex:
+    """Per-worker prefix index over item code, name and description
+
+    Tokens are kept as a sorted list of (token, item_code) pairs, so all items with
+    a token starting with a prefix form one contiguous range found by bisection.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.frequency = {}
+        self.entries = []
+        self.version = None
+        self.built_at = None
+        self.built_on = 0
+
+    def build(self, version):
+        """Load every catalog item and its requisition frequency"""
+
+        self.built_at = frappe.utils.now()
+        self.built_on = time.monotonic()
+        self.version = version
+
+        self.frequency = dict(frappe.db.sql("""
+            SELECT item_code, COUNT(*)
+            FROM `tabMaterial Request Item`
+            WHERE docstatus = 1
+            GROUP BY item_code
+        """))
+
+        self.items = {}
+        entries = []
+        for item in frappe.get_all("Item", filters=get_catalog_filters(), fields=INDEX_FIELDS):
+            self.items[item.item_code] = item
+            entries.extend((token, item.item_code) for token in get_item_tokens(item))
+
+        entries.sort()
+        self.entries = entries
+
+    def apply_changes(self, version):
+        """Re-index only the items modified since the last build or refresh"""
+
+        changed_since = self.built_at
+        self.built_at = frappe.utils.now()
+        self.version = version
+
+        changed = frappe.get_all(
+            "Item",
+            filters={"modified": [">=", changed_since]},
+            fields=INDEX_FIELDS + ["disabled", "is_stock_item"]
+        )
+
+        for item in changed:
+            self.remove(item.item_code)
+            if not item.pop("disabled") and item.pop("is_stock_item", 0):
+                self.add(item)
+
+    def add(self, item):
+        self.items[item.item_code] = item
+        for token in get_item_tokens(item):
+            insort(self.entries, (token, item.item_code))
+
+    def remove(self, item_code):
+        item = self.items.pop(item_code, None)
+        if not item:
+            return
+        for token in get_item_tokens(item):
+            position = bisect_left(self.entries, (token, item_code))
+            if position < len(self.entries) and self.entries[position] == (token, item_code):
+                del self.entries[position]
+
+    def match_prefix(self, prefix):
+        """Item codes having at least one token that starts with prefix"""
+        matches = set()
+        position = bisect_left(self.entries, (prefix, ""))
+        while position < len(self.entries) and self.entries[position][0].startswith(prefix):
+            matches.add(self.entries[position][1])
+            position += 1
+        return matches
+
+    def search(self, query, limit=10):
+        """Items matching every query token as a prefix, most requisitioned first"""
+
+        tokens = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not tokens:
+            return []
+
+        # Start from the longest (most selective) token and narrow down
+        matches = self.match_prefix(tokens[0])
+        for token in tokens[1:]:
+            if not matches:
+                break
+            matches &= self.match_prefix(token)
+
+        ranked = sorted(
+            matches,
+            key=lambda item_code: (-self.frequency.get(item_code, 0), self.items[item_code].item_name or "")
+        )[:int(limit)]
+
+        results = []
+        for item_code in ranked:
+            item = self.items[item_code]
+            results.append({
+                "item_code": item.item_code,
+                "item_name": item.item_name,
+                "item_group": item.item_group,
+                "stock_uom": item.stock_uom,
+                "image": item.image or get_default_item_image(item.item_group),
+                "requisition_count": self.frequency.get(item_code, 0)
+            })
+        return results
+
+def get_counter(key):
+    """Read a plain integer counter shared through Redis"""
+    return int(frappe.cache.get(frappe.cache.make_key(key)) or 0)
+
+def get_index():
+    """Get this worker's index for the current site, building or refreshing it lazily"""
+
+    version = get_counter(INDEX_VERSION_KEY)
+    rebuild_version = get_counter(REBUILD_VERSION_KEY)
+
+    with _lock:
+        index = _indexes.get(frappe.local.site)
+        if (
+            index is None
+            or index.version < rebuild_version
+            or time.monotonic() - index.built_on > INDEX_MAX_AGE
+        ):
+            index = ItemPrefixIndex()
+            index.build(version)
+            _indexes[frappe.local.site] = index
+        elif index.version != version:
+            index.apply_changes(version)
+
+    return index
+
+def search_items(query, limit=10):
+    """Typeahead search over the item catalog"""
+    return get_index().search(query, limit)
+
+def mark_index_stale(doc=None, method=None):
+    """doc_events handler telling every worker to refresh its index after an Item change"""
+
+    version = frappe.cache.incrby(frappe.cache.make_key(INDEX_VERSION_KEY), 1)
+
+    # Deleted items no longer show up in the modified-since refresh
+    if method == "on_trash":
+        frappe.cache.set(frappe.cache.make_key(REBUILD_VERSION_KEY), version)
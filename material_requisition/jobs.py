@@ -0,0 +1,111 @@
+import frappe
+from frappe import _
+
+# Background job state is kept in the cache for a day after the last update
+JOB_STATUS_TTL = 24 * 60 * 60
+
+JOB_REALTIME_EVENT = "promep_job_update"
+
+# A chunked job with no chunk recorded for this long is reported as stalled,
+# e.g. when a worker died before recording its chunk
+JOB_STALL_TIMEOUT = 2 * 60 * 60
+
+def get_job_key(job_id):
+    return f"promep_job:{job_id}"
+
+def create_job(job_type, **fields):
+    """Register a new background job for the current user and return its ID"""
+
+    job_id = frappe.generate_hash(length=16)
+    job = {
+        "job_id": job_id,
+        "job_type": job_type,
+        "status": "queued",
+        "user": frappe.session.user,
+        "created": frappe.utils.now(),
+        **fields
+    }
+    frappe.cache.set_value(get_job_key(job_id), job, expires_in_sec=JOB_STATUS_TTL)
+    return job_id
+
+def update_job(job_id, **fields):
+    """Update a job's state and notify its owner over realtime"""
+
+    job = frappe.cache.get_value(get_job_key(job_id)) or {"job_id": job_id}
+    job.update(fields, modified=frappe.utils.now())
+    frappe.cache.set_value(get_job_key(job_id), job, expires_in_sec=JOB_STATUS_TTL)
+
+    if job.get("user"):
+        frappe.publish_realtime(JOB_REALTIME_EVENT, job, user=job["user"], after_commit=False)
+
+    return job
+
+def get_job(job_id):
+    """Get a job's state, only for the user who started it (or an Administrator)"""
+
+    job = frappe.cache.get_value(get_job_key(job_id))
+    if not job:
+        frappe.throw(_("Job {0} not found or expired").format(job_id), frappe.DoesNotExistError)
+
+    if job.get("user") != frappe.session.user and frappe.session.user != "Administrator":
+        frappe.throw(_("Not permitted to view this job"), frappe.PermissionError)
+
+    return job
+
+def get_job_chunks_key(job_id):
+    return f"promep_job_chunks:{job_id}"
+
+def record_job_chunk(job_id, chunk_index, results):
+    """Store the results of one chunk of a chunked job and publish progress
+
+    Chunks may finish concurrently on different workers, so each one writes its
+    own hash field and progress is derived from the number of fields.
+    """
+
+    key = get_job_chunks_key(job_id)
+    frappe.cache.hset(key, str(chunk_index), {"results": results, "recorded": frappe.utils.now()})
+    frappe.cache.expire(frappe.cache.make_key(key), JOB_STATUS_TTL)
+
+    job = get_job_progress(frappe.cache.get_value(get_job_key(job_id)) or {"job_id": job_id})
+    if job.get("user"):
+        # Progress only; the full results are fetched by polling
+        progress = {field: value for field, value in job.items() if field != "results"}
+        frappe.publish_realtime(JOB_REALTIME_EVENT, progress, user=job["user"], after_commit=False)
+
+    return job
+
+def get_job_progress(job):
+    """Add completed chunk count, status and ordered results to a chunked job
+
+    A job whose chunks stopped arriving for JOB_STALL_TIMEOUT is reported as
+    ``stalled`` with the indexes of its ``missing_chunks``; it still completes
+    if they are recorded later.
+    """
+
+    chunks = {
+        int(frappe.safe_decode(index)): chunk
+        for index, chunk in (frappe.cache.hgetall(get_job_chunks_key(job["job_id"])) or {}).items()
+    }
+
+    job["completed_chunks"] = len(chunks)
+    job["results"] = [result for index in sorted(chunks) for result in chunks[index]["results"]]
+    if job.get("total_chunks") is not None and len(chunks) >= job["total_chunks"]:
+        job["status"] = "completed"
+    elif is_stalled(job, chunks):
+        job["status"] = "stalled"
+        job["missing_chunks"] = [index for index in range(job["total_chunks"]) if index not in chunks]
+    elif chunks:
+        job["status"] = "running"
+
+    return job
+
+def is_stalled(job, chunks):
+    """Whether a chunked job has had no progress for JOB_STALL_TIMEOUT"""
+
+    if job.get("total_chunks") is None:
+        return False
+
+    last_activity = max([job.get("created") or "", *(chunk["recorded"] for chunk in chunks.values())])
+    return bool(last_activity) and (
+        frappe.utils.time_diff_in_seconds(frappe.utils.now(), last_activity) > JOB_STALL_TIMEOUT
+    )
@@ -0,0 +1,176 @@
+import frappe
+
+from material_requisition.status_counters import (
+    apply_status_changes,
+    get_request_status,
+    reconcile_status_counters,
+)
+
+# Read model with one row per submitted Material Request Item (see ProMEP Line Item)
+LINE_ITEM_INDEX = "ProMEP Line Item"
+
+REBUILD_CHUNK_SIZE = 500
+
+SUPPLIERS_SUBQUERY = """
+    SELECT JSON_ARRAYAGG(JSON_OBJECT(
+        'supplier', itsup.supplier,
+        'supplier_name', COALESCE(sup.supplier_name, itsup.supplier)
+    ))
+    FROM `tabItem Supplier` itsup
+    LEFT JOIN `tabSupplier` sup ON itsup.supplier = sup.name
+    WHERE itsup.parent = {item_code}
+"""
+
+def refresh_material_requests(material_requests, update_counters=True):
+    """Rebuild the read-model rows for the given material requests
+
+    Rows are deleted and re-inserted from the source tables in two statements, so
+    cancelled requests and removed lines drop out of the index as well. The request
+    statuses held by the old rows are compared with the new ones to move the
+    dashboard status counters.
+    """
+
+    names = sorted({name for name in material_requests or [] if name})
+    if not names:
+        return
+
+    if update_counters:
+        before = get_indexed_request_statuses(names)
+
+    frappe.db.sql(
+        "DELETE FROM `tabProMEP Line Item` WHERE material_request IN %(names)s",
+        {"names": names}
+    )
+
+    suppliers_subquery = SUPPLIERS_SUBQUERY.format(item_code="mri.item_code")
+    frappe.db.sql(f"""
+        INSERT INTO `tabProMEP Line Item` (
+            name, creation, modified, modified_by, owner, docstatus, idx,
+            material_request, material_request_type, item_code, item_name, description,
+            item_status, qty, uom, ordered_qty, received_qty, pending_qty, rate, amount,
+            item_schedule_date, transaction_date, request_schedule_date, request_status,
+            per_ordered, per_received, company, project, requested_by, request_creation,
+            reverse_idx, suppliers
+        )
+        SELECT
+            mri.name, NOW(6), NOW(6), 'Administrator', 'Administrator', 0, mri.idx,
+            mr.name,
+            mr.material_request_type,
+            mri.item_code,
+            mri.item_name,
+            mri.description,
+            CASE
+                WHEN COALESCE(mri.received_qty, 0) >= mri.qty THEN 'received'
+                WHEN COALESCE(mri.ordered_qty, 0) >= mri.qty THEN 'ordered'
+                WHEN COALESCE(mri.ordered_qty, 0) > 0 THEN 'partial'
+                ELSE 'pending'
+            END,
+            mri.qty,
+            mri.uom,
+            COALESCE(mri.ordered_qty, 0),
+            COALESCE(mri.received_qty, 0),
+            mri.qty - COALESCE(mri.ordered_qty, 0),
+            mri.rate,
+            mri.amount,
+            mri.schedule_date,
+            mr.transaction_date,
+            mr.schedule_date,
+            mr.status,
+            COALESCE(mr.per_ordered, 0),
+            COALESCE(mr.per_received, 0),
+            mr.company,
+            mr.project,
+            mr.owner,
+            mr.creation,
+            -mri.idx,
+            COALESCE(({suppliers_subquery}), '[]')
+        FROM `tabMaterial Request Item` mri
+        JOIN `tabMaterial Request` mr ON mri.parent = mr.name
+        WHERE mr.name IN %(names)s
+            AND mr.docstatus = 1
+    """, {"names": names})
+
+    if update_counters:
+        apply_status_changes(before, get_indexed_request_statuses(names))
+
+def get_indexed_request_statuses(material_requests):
+    """Dashboard status, company and project of requests as currently indexed"""
+
+    rows = frappe.db.sql("""
+        SELECT DISTINCT material_request, per_ordered, per_received, company, project
+        FROM `tabProMEP Line Item`
+        WHERE material_request IN %(names)s
+    """, {"names": list(material_requests)}, as_dict=True)
+
+    return {
+        row.material_request: (get_request_status(row.per_ordered, row.per_received), row.company, row.project)
+        for row in rows
+    }
+
+def refresh_item_suppliers(item_code):
+    """Refresh the denormalized supplier list on every line for one item"""
+
+    suppliers_subquery = SUPPLIERS_SUBQUERY.format(item_code="%(item_code)s")
+    frappe.db.sql(f"""
+        UPDATE `tabProMEP Line Item`
+        SET suppliers = COALESCE(({suppliers_subquery}), '[]')
+        WHERE item_code = %(item_code)s
+    """, {"item_code": item_code})
+
+def rebuild_line_item_index(chunk_size=REBUILD_CHUNK_SIZE, commit=True):
+    """Rebuild the whole read model from submitted material requests in chunks
+
+    Each chunk replaces its own rows, so the index stays readable while the rebuild runs.
+    """
+
+    last_name = ""
+    rebuilt = 0
+    while True:
+        names = frappe.db.sql_list("""
+            SELECT name FROM `tabMaterial Request`
+            WHERE docstatus = 1 AND name > %s
+            ORDER BY name
+            LIMIT %s
+        """, (last_name, int(chunk_size)))
+
+        if not names:
+            break
+
+        refresh_material_requests(names, update_counters=False)
+        rebuilt += len(names)
+        last_name = names[-1]
+
+        if commit:
+            frappe.db.commit()
+
+    # Drop rows whose material request was cancelled or deleted since it was indexed
+    frappe.db.sql("""
+        DELETE li FROM `tabProMEP Line Item` li
+        LEFT JOIN `tabMaterial Request` mr ON li.material_request = mr.name
+        WHERE mr.name IS NULL OR mr.docstatus != 1
+    """)
+
+    if commit:
+        frappe.db.commit()
+
+    # Counters were not moved per chunk, so recount them once from the source table
+    reconcile_status_counters(commit=commit, raise_exception=True)
+
+    return rebuilt
+
+def get_linked_material_requests(doc):
+    """Material requests referenced by the item rows of a PO or purchase receipt"""
+    return {item.material_request for item in doc.get("items") or [] if item.get("material_request")}
+
+def on_material_request_change(doc, method=None):
+    """doc_events handler for Material Request submit/cancel/update after submit"""
+    refresh_material_requests([doc.name])
+
+def on_purchase_document_change(doc, method=None):
+    """doc_events handler for Purchase Order and Purchase Receipt submit/cancel"""
+    refresh_material_requests(get_linked_material_requests(doc))
+
+def on_item_update(doc, method=None):
+    """doc_events handler for Item updates that may change its supplier list"""
+    if frappe.db.exists(LINE_ITEM_INDEX, {"item_code": doc.name}):
+        refresh_item_suppliers(doc.name)
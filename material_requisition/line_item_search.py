@@ -0,0 +1,95 @@
+import re
+
+import frappe
+
+# FULLTEXT index over the ProMEP Line Item read model, created in on_doctype_update
+FULLTEXT_INDEX = "item_search"
+FULLTEXT_COLUMNS = ("item_code", "item_name")
+
+# InnoDB does not index tokens shorter than innodb_ft_min_token_size (3 by default)
+MIN_TOKEN_LENGTH = 3
+
+# Extra rank given to lines whose item code starts with the search term
+ITEM_CODE_PREFIX_BOOST = 10
+
+def ensure_fulltext_index():
+    """Add the FULLTEXT index used for item search if it does not exist yet"""
+
+    exists = frappe.db.sql(
+        "SHOW INDEX FROM `tabProMEP Line Item` WHERE Key_name = %s",
+        (FULLTEXT_INDEX,)
+    )
+    if exists:
+        return
+
+    columns = ", ".join(f"`{column}`" for column in FULLTEXT_COLUMNS)
+    frappe.db.sql_ddl(
+        f"ALTER TABLE `tabProMEP Line Item` ADD FULLTEXT INDEX `{FULLTEXT_INDEX}` ({columns})"
+    )
+
+def tokenize(term):
+    """Split a search term into lowercase word tokens"""
+    return [token for token in re.split(r"[^\w]+", (term or "").lower()) if token]
+
+def escape_like(value):
+    """Escape LIKE wildcards so user input only matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def get_search_condition(term, values, alias="li"):
+    """Build a parameterized WHERE condition matching line items against a search term
+
+    Tokens long enough for the FULLTEXT index become required prefix matches in
+    boolean mode. Shorter tokens fall back to an anchored ``LIKE 'x%'`` on item code
+    or name, which can still use the item_code index.
+    """
+
+    tokens = tokenize(term)
+    if not tokens:
+        return None
+
+    conditions = []
+
+    indexed_tokens = [token for token in tokens if len(token) >= MIN_TOKEN_LENGTH]
+    if indexed_tokens:
+        values["search_expression"] = " ".join(f"+{token}*" for token in indexed_tokens)
+        columns = ", ".join(f"{alias}.{column}" for column in FULLTEXT_COLUMNS)
+        conditions.append(f"MATCH({columns}) AGAINST (%(search_expression)s IN BOOLEAN MODE)")
+
+    for i, token in enumerate(token for token in tokens if len(token) < MIN_TOKEN_LENGTH):
+        key = f"search_prefix_{i}"
+        values[key] = f"{escape_like(token)}%"
+        conditions.append(f"({alias}.item_code LIKE %({key})s OR {alias}.item_name LIKE %({key})s)")
+
+    return "(" + " AND ".join(conditions) + ")"
+
+def search_line_items(term, limit=20):
+    """Return line items matching a search term, best matches first"""
+
+    values = {
+        "limit": int(limit),
+        "code_prefix": f"{escape_like((term or '').strip())}%",
+        "code_boost": ITEM_CODE_PREFIX_BOOST
+    }
+    condition = get_search_condition(term, values)
+    if not condition:
+        return []
+
+    # Fulltext relevance, boosted when the item code itself starts with the term
+    score = "(li.item_code LIKE %(code_prefix)s) * %(code_boost)s"
+    if "search_expression" in values:
+        columns = ", ".join(f"li.{column}" for column in FULLTEXT_COLUMNS)
+        score += f" + MATCH({columns}) AGAINST (%(search_expression)s IN BOOLEAN MODE)"
+
+    return frappe.db.sql(f"""
+        SELECT
+            li.name as line_item_id,
+            li.item_code,
+            li.item_name,
+            li.material_request,
+            li.item_status,
+            {score} as score
+        FROM `tabProMEP Line Item` li
+        WHERE {condition}
+        ORDER BY score DESC, li.request_creation DESC
+        LIMIT %(limit)s
+    """, values, as_dict=True)
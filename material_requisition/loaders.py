@@ -0,0 +1,113 @@
+import frappe
+
+# Material Request Item columns returned by the request list and detail endpoints
+REQUEST_ITEM_FIELDS = [
+    "name", "parent", "idx", "item_code", "item_name", "description", "qty", "uom",
+    "ordered_qty", "received_qty", "rate", "amount", "schedule_date", "warehouse"
+]
+
+# Names per IN (...) list, keeping each query bounded for large inputs
+LOADER_CHUNK_SIZE = 200
+
+def chunked(names, size=LOADER_CHUNK_SIZE):
+    for i in range(0, len(names), size):
+        yield names[i:i + size]
+
+def load_request_items(material_requests, fields=None):
+    """Load the item rows of many material requests in one query
+
+    Returns a dict of material request name -> list of item rows in idx order.
+    """
+
+    names = list(dict.fromkeys(name for name in material_requests or [] if name))
+    items_by_request = {name: [] for name in names}
+    if not names:
+        return items_by_request
+
+    fields = list(fields or REQUEST_ITEM_FIELDS)
+    for required in ("parent", "idx"):
+        if required not in fields:
+            fields.append(required)
+
+    items = frappe.get_all(
+        "Material Request Item",
+        filters={"parent": ["in", names], "parenttype": "Material Request"},
+        fields=fields,
+        order_by="parent asc, idx asc"
+    )
+
+    for item in items:
+        items_by_request[item.parent].append(item)
+
+    return items_by_request
+
+def load_purchase_orders(material_requests, docstatus=None):
+    """Load the purchase orders linked to many material requests in one joined query per chunk
+
+    Returns a dict of material request name -> list of purchase orders, newest first.
+    ``docstatus`` restricts the purchase orders, e.g. to 1 for submitted only.
+    Long name lists are queried in chunks of LOADER_CHUNK_SIZE.
+    """
+
+    names = list(dict.fromkeys(name for name in material_requests or [] if name))
+    orders_by_request = {name: [] for name in names}
+    if not names:
+        return orders_by_request
+
+    values = {}
+    docstatus_condition = ""
+    if docstatus is not None:
+        docstatus_condition = "AND po.docstatus = %(docstatus)s"
+        values["docstatus"] = int(docstatus)
+
+    for chunk in chunked(names):
+        values["names"] = chunk
+        purchase_orders = frappe.db.sql(f"""
+            SELECT
+                poi.material_request,
+                po.name,
+                po.supplier,
+                po.supplier_name,
+                po.transaction_date,
+                po.status,
+                po.docstatus,
+                po.per_received,
+                po.grand_total,
+                po.currency,
+                COUNT(poi.name) as item_count
+            FROM `tabPurchase Order Item` poi
+            JOIN `tabPurchase Order` po ON poi.parent = po.name
+            WHERE poi.material_request IN %(names)s
+                {docstatus_condition}
+            GROUP BY poi.material_request, po.name
+            ORDER BY po.creation DESC
+        """, values, as_dict=True)
+
+        for purchase_order in purchase_orders:
+            orders_by_request[purchase_order.pop("material_request")].append(purchase_order)
+
+    return orders_by_request
+
+def load_line_items(line_item_ids, fields=None, for_update=False):
+    """Load Material Request Item rows by name in one query
+
+    ``for_update`` locks the rows until the transaction ends, so concurrent orders
+    cannot read the same ordered quantities. Returns a dict of name -> row.
+    """
+
+    names = list(dict.fromkeys(name for name in line_item_ids or [] if name))
+    if not names:
+        return {}
+
+    fields = list(fields or REQUEST_ITEM_FIELDS)
+    if "name" not in fields:
+        fields.append("name")
+
+    items = frappe.get_all(
+        "Material Request Item",
+        filters={"name": ["in", names]},
+        fields=fields,
+        for_update=for_update
+    )
+
+    return {item.name: item for item in items}
@@ -0,0 +1,47 @@
+import base64
+import json
+
+import frappe
+from frappe import _
+from werkzeug.wrappers import Response
+
+def encode_cursor(key):
+    """Build an opaque cursor from the sort key values of the last row on a page"""
+    return base64.urlsafe_b64encode(json.dumps([str(value) for value in key]).encode()).decode()
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor into its list of sort key values"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        key = None
+
+    if not isinstance(key, list) or len(key) != size:
+        frappe.throw(_("Invalid cursor"))
+
+    return key
+
+def stream_ndjson(query, values=None):
+    """Stream the rows of a query as newline-delimited JSON
+
+    The response body is produced after the request handler has returned and torn
+    down its site connection, so the generator opens its own connection as the
+    current user and reads through an unbuffered cursor. Memory use stays flat no
+    matter how many rows match.
+    """
+
+    site = frappe.local.site
+    user = frappe.session.user
+
+    def generate():
+        frappe.init(site=site)
+        frappe.connect(set_admin_as_user=False)
+        frappe.set_user(user)
+        try:
+            with frappe.db.unbuffered_cursor():
+                for row in frappe.db.sql(query, values, as_dict=True, as_iterator=True):
+                    yield frappe.as_json(row, indent=None) + "\n"
+        finally:
+            frappe.destroy()
+
+    return Response(generate(), mimetype="application/x-ndjson")
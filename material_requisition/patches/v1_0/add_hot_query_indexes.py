@@ -0,0 +1,5 @@
+from material_requisition.db_indexes import ensure_hot_query_indexes
+
+def execute():
+    """Add composite indexes for the app's request list, status and MR -> PO queries"""
+    ensure_hot_query_indexes()
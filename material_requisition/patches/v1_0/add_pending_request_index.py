@@ -0,0 +1,6 @@
+from material_requisition.db_indexes import ensure_hot_query_indexes
+
+
+def execute():
+    """Add the read model index paging get_pending_material_requests"""
+    ensure_hot_query_indexes()
@@ -0,0 +1,5 @@
+from material_requisition.line_item_index import rebuild_line_item_index
+
+def execute():
+    """Populate the ProMEP Line Item read model for existing material requests"""
+    rebuild_line_item_index()
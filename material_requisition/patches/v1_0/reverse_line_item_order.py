@@ -0,0 +1,13 @@
+import frappe
+
+
+def execute():
+    """Fill ProMEP Line Item.reverse_idx and drop the index it replaces for line item pages"""
+
+    frappe.db.sql("UPDATE `tabProMEP Line Item` SET reverse_idx = -idx")
+
+    # The old index mixed sort directions with the page order, forcing a filesort
+    if frappe.db.has_index("tabProMEP Line Item", "request_creation_material_request_idx_index"):
+        frappe.db.sql_ddl(
+            "ALTER TABLE `tabProMEP Line Item` DROP INDEX `request_creation_material_request_idx_index`"
+        )
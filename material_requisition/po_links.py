@@ -0,0 +1,70 @@
+import frappe
+
+from material_requisition.caching import get_cached_values
+from material_requisition.line_item_index import get_linked_material_requests
+from material_requisition.loaders import load_purchase_orders
+
+# Prefix of the per material request cache keys holding the linked purchase orders
+# with status and totals, invalidated by Purchase Order and Purchase Receipt events
+PO_LINKS_CACHE_KEY = "promep_po_links"
+
+# Purchase order status changes that bypass doc events are picked up within this time
+PO_LINKS_TTL = 6 * 60 * 60
+
+def get_purchase_order_links_key(material_request):
+    return f"{PO_LINKS_CACHE_KEY}:{material_request}"
+
+def get_purchase_order_links(material_requests, docstatus=None):
+    """Purchase orders linked to many material requests, read through the link cache
+
+    Returns a dict of material request name -> list of purchase orders, newest first,
+    in the shape of load_purchase_orders. Requests missing from the cache are loaded
+    in one query and cached with every docstatus; ``docstatus`` filters the result.
+    Each request is cached under its own key and expires on its own.
+    """
+
+    names = list(dict.fromkeys(name for name in material_requests or [] if name))
+    keys = {name: get_purchase_order_links_key(name) for name in names}
+    cached = get_cached_values(keys.values())
+    links = {name: cached[keys[name]] for name in names if keys[name] in cached}
+
+    missing = [name for name in names if name not in links]
+    if missing:
+        loaded = load_purchase_orders(missing)
+        for name in missing:
+            links[name] = loaded[name]
+            frappe.cache.set_value(keys[name], loaded[name], expires_in_sec=PO_LINKS_TTL)
+
+    if docstatus is not None:
+        return {
+            name: [po for po in links[name] if po.docstatus == int(docstatus)]
+            for name in names
+        }
+
+    return {name: links[name] for name in names}
+
+def clear_purchase_order_links(material_requests):
+    """Drop the cached links of the given material requests"""
+    if material_requests:
+        frappe.cache.delete_value([get_purchase_order_links_key(name) for name in material_requests])
+
+def clear_all_purchase_order_links():
+    """Drop every cached purchase order link"""
+    frappe.cache.delete_keys(f"{PO_LINKS_CACHE_KEY}:")
+
+def on_purchase_document_change(doc, method=None):
+    """doc_events handler for Purchase Order and Purchase Receipt changes
+
+    Requests the document linked before this save are cleared as well, so a
+    request removed from a draft does not keep showing the document.
+    """
+
+    material_requests = get_linked_material_requests(doc)
+    doc_before_save = doc.get_doc_before_save()
+    if doc_before_save:
+        material_requests |= get_linked_material_requests(doc_before_save)
+
+    if material_requests:
+        clear_purchase_order_links(material_requests)
+        # Drop again after commit, in case a concurrent read cached the old links
+        frappe.db.after_commit.add(lambda: clear_purchase_order_links(material_requests))
@@ -0,0 +1,22 @@
+# Copyright (c) 2025, ExN and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class ProMEPLineItem(Document):
+	pass
+
+
+def on_doctype_update():
+	# Keyset pagination in get_line_items reads this index backwards: newest request
+	# first, and reverse_idx (-idx) descending keeps each request's lines in row order
+	frappe.db.add_index("ProMEP Line Item", ["request_creation", "material_request", "reverse_idx"])
+	frappe.db.add_index("ProMEP Line Item", ["item_status", "request_creation"])
+	# Refreshes and get_pending_material_requests look rows up by material request
+	frappe.db.add_index("ProMEP Line Item", ["material_request", "idx"])
+
+	from material_requisition.line_item_search import ensure_fulltext_index
+
+	ensure_fulltext_index()
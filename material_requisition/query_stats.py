@@ -0,0 +1,45 @@
+import time
+
+import frappe
+
+class QueryRecorder:
+    """Count the SQL statements run through frappe.db.sql while the block runs
+
+    Records the number of queries, total database time and rows returned.
+    ``keep_queries`` also keeps each statement with its duration. Recorders can
+    be nested; an outer recorder also counts the queries of the inner ones.
+    """
+
+    def __init__(self, keep_queries=False):
+        self.keep_queries = keep_queries
+        self.count = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self.queries = []
+
+    def __enter__(self):
+        self.db = frappe.db
+        self.original_sql = self.db.sql
+        self.db.sql = self.sql
+        return self
+
+    def __exit__(self, *exc_info):
+        self.db.sql = self.original_sql
+
+    def sql(self, query, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = self.original_sql(query, *args, **kwargs)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.db_time += duration
+            if self.keep_queries:
+                # The executed statement has its parameters filled in, so it can be EXPLAINed
+                executed = frappe.safe_decode(getattr(self.db, "last_query", None) or str(query))
+                self.queries.append({"query": executed.strip(), "duration": round(duration * 1000, 3)})
+
+        if isinstance(result, (list, tuple)):
+            self.rows += len(result)
+
+        return result
@@ -0,0 +1,133 @@
+import hashlib
+
+import frappe
+
+STATUS_COUNTER = "ProMEP Status Counter"
+
+DASHBOARD_STATUSES = ("pending", "partial", "ordered", "received")
+
+# Received is checked first so a fully ordered and fully received request
+# is not counted as 'ordered'
+STATUS_CASE_SQL = """
+    CASE
+        WHEN COALESCE(per_received, 0) >= 100 THEN 'received'
+        WHEN COALESCE(per_ordered, 0) >= 100 THEN 'ordered'
+        WHEN COALESCE(per_ordered, 0) > 0 THEN 'partial'
+        ELSE 'pending'
+    END
+"""
+
+# WHERE conditions selecting each status, consistent with STATUS_CASE_SQL
+STATUS_CONDITIONS = {
+    "pending": "COALESCE(per_ordered, 0) <= 0 AND COALESCE(per_received, 0) < 100",
+    "partial": "per_ordered > 0 AND per_ordered < 100 AND COALESCE(per_received, 0) < 100",
+    "ordered": "per_ordered >= 100 AND COALESCE(per_received, 0) < 100",
+    "received": "per_received >= 100",
+}
+
+def get_request_status(per_ordered, per_received):
+    """Dashboard status of a material request, matching STATUS_CASE_SQL"""
+    if (per_received or 0) >= 100:
+        return 'received'
+    elif (per_ordered or 0) >= 100:
+        return 'ordered'
+    elif (per_ordered or 0) > 0:
+        return 'partial'
+    return 'pending'
+
+def get_counter_name(status, company=None, project=None):
+    """Deterministic counter row name for a (status, company, project) key"""
+    key = "\n".join([status, company or "", project or ""])
+    return hashlib.md5(key.encode()).hexdigest()
+
+def increment_counter(status, company=None, project=None, delta=1):
+    """Atomically add delta to one status counter, creating it if needed"""
+
+    frappe.db.sql("""
+        INSERT INTO `tabProMEP Status Counter`
+            (name, creation, modified, modified_by, owner, docstatus, idx,
+             status, company, project, count)
+        VALUES
+            (%(name)s, NOW(6), NOW(6), 'Administrator', 'Administrator', 0, 0,
+             %(status)s, %(company)s, %(project)s, %(delta)s)
+        ON DUPLICATE KEY UPDATE count = count + %(delta)s, modified = NOW(6)
+    """, {
+        "name": get_counter_name(status, company, project),
+        "status": status,
+        "company": company,
+        "project": project,
+        "delta": int(delta)
+    })
+
+def apply_status_changes(before, after):
+    """Move counts between counters for material requests whose status changed
+
+    ``before`` and ``after`` map material request name -> (status, company, project).
+    A request missing from ``after`` is no longer counted, e.g. after cancellation.
+    """
+
+    deltas = {}
+    for name in set(before) | set(after):
+        old_key, new_key = before.get(name), after.get(name)
+        if old_key == new_key:
+            continue
+        if old_key:
+            deltas[old_key] = deltas.get(old_key, 0) - 1
+        if new_key:
+            deltas[new_key] = deltas.get(new_key, 0) + 1
+
+    for (status, company, project), delta in deltas.items():
+        if delta:
+            increment_counter(status, company, project, delta)
+
+def get_status_counts(company=None, project=None):
+    """Read the dashboard status counts, optionally for one company and project"""
+
+    conditions = ["1=1"]
+    values = {}
+    if company:
+        conditions.append("company = %(company)s")
+        values["company"] = company
+    if project:
+        conditions.append("project = %(project)s")
+        values["project"] = project
+
+    counts = dict(frappe.db.sql(f"""
+        SELECT status, SUM(count)
+        FROM `tabProMEP Status Counter`
+        WHERE {" AND ".join(conditions)}
+        GROUP BY status
+    """, values))
+
+    return [{"status": status, "count": int(counts.get(status) or 0)} for status in DASHBOARD_STATUSES]
+
+def reconcile_status_counters(commit=True, raise_exception=False):
+    """Recompute every counter from submitted material requests to correct drift
+
+    ``commit=False`` leaves the transaction to the caller, and ``raise_exception``
+    lets failures reach the caller instead of only being logged (the scheduled run
+    logs them).
+    """
+
+    try:
+        actual = frappe.db.sql(f"""
+            SELECT {STATUS_CASE_SQL} as status, company, project, COUNT(*) as count
+            FROM `tabMaterial Request`
+            WHERE docstatus = 1
+            GROUP BY status, company, project
+        """, as_dict=True)
+
+        frappe.db.sql("DELETE FROM `tabProMEP Status Counter`")
+        for row in actual:
+            increment_counter(row.status, row.company, row.project, row.count)
+
+        if commit:
+            frappe.db.commit()
+
+    except Exception as e:
+        # Only roll back a transaction this function owns
+        if commit:
+            frappe.db.rollback()
+        frappe.log_error(f"Reconcile Status Counters Error: {str(e)}")
+        if raise_exception:
+            raise
@@ -0,0 +1,150 @@
+import frappe
+
+from material_requisition.line_item_index import refresh_material_requests
+
+# Modification time up to which material request statuses are known to be current
+STATUS_SYNC_WATERMARK = "promep_status_sync_watermark"
+
+# Progress of the first, full sync, which runs over several jobs before a
+# watermark exists: the time it started and the last request it synced
+STATUS_SYNC_BACKFILL_STARTED = "promep_status_sync_backfill_started"
+STATUS_SYNC_BACKFILL_AFTER = "promep_status_sync_backfill_after"
+STATUS_SYNC_BACKFILL_LIMIT = 5000
+
+# Held while a sync runs so the scheduler and manual triggers do not overlap. The
+# TTL is renewed after every chunk, so it only has to cover a single chunk.
+STATUS_SYNC_LOCK_KEY = "promep_status_sync_lock"
+STATUS_SYNC_LOCK_TTL = 10 * 60
+
+STATUS_SYNC_CHUNK_SIZE = 100
+
+# Renew or release the lock only while it still holds this run's token
+RENEW_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+def get_backfill_material_requests(after=None, limit=STATUS_SYNC_BACKFILL_LIMIT):
+    """Next batch of submitted Purchase material requests for the first full sync"""
+
+    return frappe.get_all(
+        "Material Request",
+        filters={"docstatus": 1, "material_request_type": "Purchase", "name": [">", after or ""]},
+        order_by="name asc",
+        limit=int(limit),
+        pluck="name"
+    )
+
+def get_dirty_material_requests(since):
+    """Submitted Purchase material requests touched since the watermark
+
+    A request is dirty when it, one of its lines, or a purchase order or receipt
+    linked to it was modified after ``since``.
+    """
+
+    return frappe.db.sql_list("""
+        SELECT mr.name
+        FROM `tabMaterial Request` mr
+        JOIN (
+            SELECT name as material_request FROM `tabMaterial Request`
+            WHERE modified >= %(since)s
+            UNION
+            SELECT parent FROM `tabMaterial Request Item`
+            WHERE modified >= %(since)s
+            UNION
+            SELECT poi.material_request
+            FROM `tabPurchase Order` po
+            JOIN `tabPurchase Order Item` poi ON poi.parent = po.name
+            WHERE po.modified >= %(since)s AND poi.material_request IS NOT NULL
+            UNION
+            SELECT pri.material_request
+            FROM `tabPurchase Receipt` pr
+            JOIN `tabPurchase Receipt Item` pri ON pri.parent = pr.name
+            WHERE pr.modified >= %(since)s AND pri.material_request IS NOT NULL
+        ) dirty ON dirty.material_request = mr.name
+        WHERE mr.docstatus = 1
+            AND mr.material_request_type = 'Purchase'
+        ORDER BY mr.name
+    """, {"since": since})
+
+def acquire_lock():
+    """Take the sync lock, returning this run's token or None when another run holds it"""
+    token = frappe.generate_hash(length=16)
+    if frappe.cache.set(frappe.cache.make_key(STATUS_SYNC_LOCK_KEY), token, nx=True, ex=STATUS_SYNC_LOCK_TTL):
+        return token
+    return None
+
+def renew_lock(token):
+    """Extend the sync lock, failing when this run no longer holds it"""
+    key = frappe.cache.make_key(STATUS_SYNC_LOCK_KEY)
+    if not frappe.cache.eval(RENEW_LOCK_SCRIPT, 1, key, token, STATUS_SYNC_LOCK_TTL):
+        frappe.throw("Status sync lock expired or taken over by another run")
+
+def release_lock(token):
+    """Release the sync lock unless it has since been taken by another run"""
+    frappe.cache.eval(RELEASE_LOCK_SCRIPT, 1, frappe.cache.make_key(STATUS_SYNC_LOCK_KEY), token)
+
+def sync_material_request_statuses(chunk_size=STATUS_SYNC_CHUNK_SIZE):
+    """Scheduled job updating the status of material requests changed since the last run
+
+    Requests are processed in chunks with a commit after each one, so rows are only
+    locked briefly. The watermark moves forward once every chunk has been synced;
+    a failed run is retried from the same watermark. Before a watermark exists, at
+    most STATUS_SYNC_BACKFILL_LIMIT requests are synced per run and the next run
+    continues after the last one. Returns the number of requests updated.
+    """
+
+    token = acquire_lock()
+    if not token:
+        return 0
+
+    try:
+        watermark = frappe.db.get_global(STATUS_SYNC_WATERMARK)
+        if watermark:
+            # Taken before reading so changes made during the run are picked up next time
+            started = frappe.utils.now()
+            names = get_dirty_material_requests(watermark)
+            finished = True
+        else:
+            # Changes made while the backfill runs are picked up from its start time
+            started = frappe.db.get_global(STATUS_SYNC_BACKFILL_STARTED) or frappe.utils.now()
+            names = get_backfill_material_requests(frappe.db.get_global(STATUS_SYNC_BACKFILL_AFTER))
+            finished = len(names) < STATUS_SYNC_BACKFILL_LIMIT
+
+        chunk_size = max(int(chunk_size), 1)
+        for i in range(0, len(names), chunk_size):
+            chunk = names[i:i + chunk_size]
+            for name in chunk:
+                mr_doc = frappe.get_doc("Material Request", name)
+                mr_doc.set_status(update=True, update_modified=False)
+
+            refresh_material_requests(chunk)
+            frappe.db.commit()
+            renew_lock(token)
+
+        if finished:
+            frappe.db.set_global(STATUS_SYNC_WATERMARK, started)
+            frappe.db.set_global(STATUS_SYNC_BACKFILL_STARTED, "")
+            frappe.db.set_global(STATUS_SYNC_BACKFILL_AFTER, "")
+        else:
+            frappe.db.set_global(STATUS_SYNC_BACKFILL_STARTED, started)
+            frappe.db.set_global(STATUS_SYNC_BACKFILL_AFTER, names[-1])
+        frappe.db.commit()
+
+        return len(names)
+
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Sync Material Request Status Error: {str(e)}")
+        raise
+
+    finally:
+        release_lock(token)
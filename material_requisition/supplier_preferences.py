@@ -0,0 +1,146 @@
+import frappe
+
+from material_requisition.caching import get_cached_values
+
+# Prefix of the per item and company cache keys holding the preferred supplier,
+# invalidated by Item events
+PREFERRED_SUPPLIER_CACHE_KEY = "promep_preferred_supplier"
+
+# Last purchase rates drift as orders are submitted, so each entry is rebuilt hourly
+PREFERRED_SUPPLIER_TTL = 60 * 60
+
+def get_preferred_supplier_key(item_code, company=None):
+    return f"{PREFERRED_SUPPLIER_CACHE_KEY}:{item_code}:{company or ''}"
+
+def get_preferred_suppliers(item_codes, company=None):
+    """Map item codes to their preferred supplier, loading unknown items in bulk
+
+    The preferred supplier of an item is the company's default supplier from
+    Item Default, otherwise the Item Supplier or past supplier with the lowest
+    last purchase rate, otherwise the first Item Supplier. Items without any
+    supplier map to None. Each item is cached under its own key and expires on
+    its own.
+    """
+
+    item_codes = [code for code in dict.fromkeys(item_codes) if code]
+    keys = {code: get_preferred_supplier_key(code, company) for code in item_codes}
+
+    # Entries are wrapped in a tuple so an item without a supplier is cached too
+    cached = get_cached_values(keys.values())
+    suppliers = {code: cached[keys[code]][0] for code in item_codes if keys[code] in cached}
+
+    missing = [code for code in item_codes if code not in suppliers]
+    if missing:
+        resolved = resolve_preferred_suppliers(missing, company)
+        for code in missing:
+            suppliers[code] = resolved.get(code)
+            frappe.cache.set_value(keys[code], (suppliers[code],), expires_in_sec=PREFERRED_SUPPLIER_TTL)
+
+    return {code: suppliers[code] for code in item_codes}
+
+def resolve_preferred_suppliers(item_codes, company=None):
+    """Look up preferred suppliers without any caching, in three queries"""
+
+    if not item_codes:
+        return {}
+
+    default_filters = {"parent": ["in", item_codes], "parenttype": "Item", "default_supplier": ["is", "set"]}
+    if company:
+        default_filters["company"] = company
+    default_suppliers = {}
+    for row in frappe.get_all("Item Default", filters=default_filters, fields=["parent", "default_supplier"]):
+        default_suppliers.setdefault(row.parent, row.default_supplier)
+
+    item_suppliers = {}
+    for row in frappe.get_all(
+        "Item Supplier",
+        filters={"parent": ["in", item_codes], "parenttype": "Item"},
+        fields=["parent", "supplier"],
+        order_by="parent asc, idx asc"
+    ):
+        item_suppliers.setdefault(row.parent, []).append(row.supplier)
+
+    last_rates = get_last_purchase_rates(item_codes, company)
+
+    preferred = {}
+    for code in item_codes:
+        if default_suppliers.get(code):
+            preferred[code] = default_suppliers[code]
+            continue
+
+        rates = last_rates.get(code, {})
+        candidates = list(dict.fromkeys(item_suppliers.get(code, []) + list(rates)))
+        priced = [supplier for supplier in candidates if supplier in rates]
+        if priced:
+            preferred[code] = min(priced, key=lambda supplier: rates[supplier])
+        elif candidates:
+            preferred[code] = candidates[0]
+
+    return preferred
+
+def get_last_purchase_rates(item_codes, company=None):
+    """Latest submitted purchase rate per item and supplier
+
+    Returns a dict of item code -> {supplier: base rate}.
+    """
+
+    values = {"item_codes": list(item_codes)}
+    company_condition = ""
+    if company:
+        company_condition = "AND po.company = %(company)s"
+        values["company"] = company
+
+    rows = frappe.db.sql(f"""
+        SELECT item_code, supplier, base_rate
+        FROM (
+            SELECT
+                poi.item_code,
+                po.supplier,
+                poi.base_rate,
+                ROW_NUMBER() OVER (
+                    PARTITION BY poi.item_code, po.supplier
+                    ORDER BY po.transaction_date DESC, po.creation DESC
+                ) as rate_rank
+            FROM `tabPurchase Order Item` poi
+            JOIN `tabPurchase Order` po ON poi.parent = po.name
+            WHERE poi.item_code IN %(item_codes)s
+                AND po.docstatus = 1
+                {company_condition}
+        ) rates
+        WHERE rate_rank = 1
+    """, values, as_dict=True)
+
+    last_rates = {}
+    for row in rows:
+        last_rates.setdefault(row.item_code, {})[row.supplier] = row.base_rate
+
+    return last_rates
+
+def partition_by_supplier(line_items, item_codes, company=None):
+    """Split line items into groups per preferred supplier in one pass
+
+    ``item_codes`` maps each line's ``line_item_id`` to its item code. Returns a
+    dict of supplier -> lines and the list of lines without a preferred supplier.
+    """
+
+    suppliers = get_preferred_suppliers(item_codes.values(), company)
+
+    groups = {}
+    unassigned = []
+    for line in line_items:
+        supplier = suppliers.get(item_codes.get(line["line_item_id"]))
+        if supplier:
+            groups.setdefault(supplier, []).append(line)
+        else:
+            unassigned.append(line)
+
+    return groups, unassigned
+
+def clear_preferred_supplier(doc, method=None):
+    """doc_events handler for Item changes, dropping the item's entry for every company"""
+    companies = [None, *frappe.get_all("Company", pluck="name")]
+    frappe.cache.delete_value([get_preferred_supplier_key(doc.name, company) for company in companies])
+
+def clear_all_preferred_suppliers():
+    """Drop every cached preferred supplier"""
+    frappe.cache.delete_keys(f"{PREFERRED_SUPPLIER_CACHE_KEY}:")
@@ -0,0 +1,251 @@
+# Copyright (c) 2025, ExN and Contributors
+# See license.txt
+
+import unittest
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from material_requisition.fixtures.synthetic_data import SYNTHETIC_PREFIX, generate_synthetic_data
+from material_requisition.query_stats import QueryRecorder
+
+MR = "material_requisition.api.material_request"
+PO = "material_requisition.api.purchase_order"
+DASHBOARD = "material_requisition.api.dashboard"
+
+# SQL statements per call against the fixture, with the app's Redis caches cold and
+# Frappe's metadata caches warm. The same budgets hold for NON_ADMIN_USER, since
+# permission checks read roles and user permissions from Frappe's caches. Raise a
+# budget only for a deliberate change.
+QUERY_BUDGETS = {
+    # Catalog items
+    f"{MR}.get_visual_items": 1,
+    # Items modified since the worker's prefix index was built
+    f"{MR}.search_items": 1,
+    # Material Request and its items table (get_doc)
+    f"{MR}.get_material_request_details": 2,
+    # Item suppliers and general suppliers
+    f"{MR}.get_suppliers_for_items": 2,
+    # Requests, their items and their purchase order links
+    f"{MR}.get_requests_with_po_status": 3,
+    # Page of the read model and the exact count
+    f"{MR}.get_line_items": 2,
+    f"{MR}.search_line_items": 1,
+    # Request header, items and purchase order links
+    f"{MR}.get_request_detail": 3,
+    f"{PO}.get_pending_material_requests": 1,
+    f"{PO}.get_purchase_order_status": 1,
+    f"{PO}.get_suppliers": 1,
+    f"{PO}.get_po_summary_for_requests": 1,
+    # Status counters and recent requests
+    f"{DASHBOARD}.get_dashboard_data": 2,
+    f"{DASHBOARD}.get_material_requests_by_status": 1,
+}
+
+# Size of the fixture; small enough to seed inside the test transaction
+FIXTURE = {
+    "items": 20,
+    "suppliers": 4,
+    "mr_lines": 150,
+    "purchase_orders": 10,
+    "lines_per_request": 5,
+    "seed": 7,
+}
+
+# Desk user without System Manager, seeded with the fixture
+NON_ADMIN_USER = "promep-query-budget@example.com"
+NON_ADMIN_ROLES = ["Purchase User", "Stock User"]
+
+def clear_app_caches():
+    """Drop the app's shared and request caches so every call starts cold"""
+
+    from material_requisition.defaults import DEFAULT_WAREHOUSE_CACHE_KEY, STOCK_UOM_CACHE_KEY
+    from material_requisition.item_catalog import clear_catalog_cache
+    from material_requisition.item_search import mark_index_stale
+    from material_requisition.po_links import clear_all_purchase_order_links
+    from material_requisition.supplier_preferences import clear_all_preferred_suppliers
+
+    frappe.cache.delete_value([DEFAULT_WAREHOUSE_CACHE_KEY, STOCK_UOM_CACHE_KEY])
+    clear_all_purchase_order_links()
+    clear_all_preferred_suppliers()
+    clear_catalog_cache()
+    mark_index_stale()
+    frappe.local.promep_defaults = {}
+
+
+class TestAPIQueryCounts(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        if not frappe.get_all("Company", limit=1):
+            raise unittest.SkipTest("A company is needed to seed the query count data set")
+
+        # Nothing is committed, so the class teardown rolls the fixture back
+        seeded = generate_synthetic_data(**FIXTURE, echo=lambda message: None, commit=False)
+
+        # Names are numbered from 1, so the fixture is the first rows of the prefix
+        cls.requests = frappe.get_all(
+            "Material Request",
+            filters={"name": ["like", f"{SYNTHETIC_PREFIX}-MR-%"], "docstatus": 1},
+            order_by="name asc",
+            limit=seeded["material_requests"],
+            pluck="name"
+        )
+        cls.item_codes = frappe.get_all(
+            "Item",
+            filters={"name": ["like", f"{SYNTHETIC_PREFIX}-ITEM-%"]},
+            order_by="name asc",
+            limit=seeded["items"],
+            pluck="name"
+        )
+        cls.create_non_admin_user()
+
+    @classmethod
+    def create_non_admin_user(cls):
+        if frappe.db.exists("User", NON_ADMIN_USER):
+            user = frappe.get_doc("User", NON_ADMIN_USER)
+        else:
+            user = frappe.get_doc({
+                "doctype": "User",
+                "email": NON_ADMIN_USER,
+                "first_name": "Query Budget",
+                "send_welcome_email": 0
+            }).insert(ignore_permissions=True)
+        user.add_roles(*NON_ADMIN_ROLES)
+
+    def measure(self, method, **kwargs):
+        """Call an endpoint cold and return its result and query recorder"""
+
+        fn = frappe.get_attr(method)
+        # Warm Frappe's own metadata caches, which are not under test
+        fn(**kwargs)
+        clear_app_caches()
+
+        with QueryRecorder(keep_queries=True) as recorder:
+            result = fn(**kwargs)
+        return result, recorder
+
+    def assertWithinBudget(self, method, **kwargs):
+        result, recorder = self.measure(method, **kwargs)
+        budget = QUERY_BUDGETS[method]
+
+        self.assertLessEqual(
+            recorder.count, budget,
+            msg=f"{method} ran {recorder.count} queries (budget {budget}):\n\n"
+            + "\n\n".join(query["query"] for query in recorder.queries)
+        )
+
+        return result
+
+    def assertConstantQueries(self, method, small, large):
+        """Fail when the query count grows with the size of the input or page"""
+
+        _, small_recorder = self.measure(method, **small)
+        _, large_recorder = self.measure(method, **large)
+
+        self.assertEqual(
+            large_recorder.count, small_recorder.count,
+            msg=f"{method} ran {small_recorder.count} queries for {small} but "
+            f"{large_recorder.count} for {large}, which suggests a query per row:\n\n"
+            + "\n\n".join(query["query"] for query in large_recorder.queries)
+        )
+
+    def test_material_request_endpoints(self):
+        self.assertWithinBudget(f"{MR}.get_visual_items")
+        self.assertWithinBudget(f"{MR}.search_items", query=self.item_codes[0][:6])
+        self.assertWithinBudget(f"{MR}.get_material_request_details", name=self.requests[0])
+        self.assertWithinBudget(f"{MR}.get_suppliers_for_items", item_codes=self.item_codes[:10])
+        self.assertWithinBudget(f"{MR}.search_line_items", query=self.item_codes[0])
+
+        requests = self.assertWithinBudget(f"{MR}.get_requests_with_po_status")
+        self.assertTrue(requests)
+
+        line_items = self.assertWithinBudget(f"{MR}.get_line_items", limit=50)
+        self.assertTrue(line_items["line_items"])
+
+        detail = self.assertWithinBudget(f"{MR}.get_request_detail", request_name=self.requests[0])
+        self.assertEqual(detail["name"], self.requests[0])
+
+    def test_purchase_order_endpoints(self):
+        self.assertWithinBudget(f"{PO}.get_suppliers")
+        self.assertWithinBudget(f"{PO}.get_purchase_order_status", material_request=self.requests[0])
+
+        pending = self.assertWithinBudget(f"{PO}.get_pending_material_requests", limit=20)
+        self.assertTrue(pending["requests"])
+
+        summary = self.assertWithinBudget(f"{PO}.get_po_summary_for_requests", material_requests=self.requests)
+        self.assertTrue(any(row["purchase_orders"] for row in summary))
+
+    def test_dashboard_endpoints(self):
+        self.assertWithinBudget(f"{DASHBOARD}.get_dashboard_data")
+
+        page = self.assertWithinBudget(f"{DASHBOARD}.get_material_requests_by_status", limit=20)
+        self.assertTrue(page["requests"])
+
+    def test_non_admin_endpoints(self):
+        with self.set_user(NON_ADMIN_USER):
+            detail = self.assertWithinBudget(f"{MR}.get_request_detail", request_name=self.requests[0])
+            self.assertEqual(detail["name"], self.requests[0])
+
+            pending = self.assertWithinBudget(f"{PO}.get_pending_material_requests", limit=20)
+            self.assertTrue(pending["requests"])
+
+            page = self.assertWithinBudget(f"{DASHBOARD}.get_material_requests_by_status", limit=20)
+            self.assertTrue(page["requests"])
+
+            self.assertConstantQueries(f"{PO}.get_pending_material_requests", {"limit": 2}, {"limit": 30})
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.assertConstantQueries(f"{MR}.get_line_items", {"limit": 5}, {"limit": 100})
+        self.assertConstantQueries(f"{MR}.get_requests_with_po_status", {"limit": 2}, {"limit": 30})
+        self.assertConstantQueries(
+            f"{MR}.get_suppliers_for_items", {"item_codes": self.item_codes[:2]}, {"item_codes": self.item_codes}
+        )
+        self.assertConstantQueries(
+            f"{PO}.get_po_summary_for_requests",
+            {"material_requests": self.requests[:2]},
+            {"material_requests": self.requests}
+        )
+        self.assertConstantQueries(f"{PO}.get_pending_material_requests", {"limit": 2}, {"limit": 30})
+        self.assertConstantQueries(f"{DASHBOARD}.get_material_requests_by_status", {"limit": 2}, {"limit": 30})
+
+    def explain_line_item_page(self, **kwargs):
+        """Run get_line_items and return its result and the EXPLAIN plan of its page query"""
+
+        with QueryRecorder(keep_queries=True) as recorder:
+            result = frappe.get_attr(f"{MR}.get_line_items")(**kwargs)
+
+        query = next(query["query"] for query in recorder.queries if "ORDER BY li.request_creation" in query["query"])
+        return result, frappe.db.sql(f"EXPLAIN {query}", as_dict=True)
+
+    def test_line_item_pages_read_in_index_order(self):
+        first_page, plan = self.explain_line_item_page(limit=20, pagination="cursor")
+        self.assertFalse(
+            any("filesort" in (row.Extra or "") for row in plan), msg=f"First page sorts its rows: {plan}"
+        )
+
+        next_page, plan = self.explain_line_item_page(
+            limit=20, pagination="cursor", cursor=first_page["next_cursor"]
+        )
+        self.assertFalse(
+            any("filesort" in (row.Extra or "") for row in plan), msg=f"Cursor page sorts its rows: {plan}"
+        )
+
+        # Pages continue each request's lines in row order
+        rows = first_page["line_items"] + next_page["line_items"]
+        keys = [(row["request_creation"], row["material_request"], -row["idx"]) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_pending_requests_page_uses_index(self):
+        with QueryRecorder(keep_queries=True) as recorder:
+            frappe.get_attr(f"{PO}.get_pending_material_requests")(limit=10)
+
+        plan = frappe.db.sql(f"EXPLAIN {recorder.queries[-1]['query']}", as_dict=True)
+        self.assertIn("promep_pending_requests", [row.key for row in plan], msg=f"Pending page plan: {plan}")
+
+    def test_invalid_cursors_are_rejected(self):
+        for method in (f"{MR}.get_line_items", f"{PO}.get_pending_material_requests"):
+            kwargs = {"pagination": "cursor"} if method.endswith("get_line_items") else {}
+            with self.assertRaises(frappe.ValidationError):
+                frappe.get_attr(method)(cursor="not-a-cursor", **kwargs)
@@ -0,0 +1,217 @@
+import hashlib
+import os
+
+import frappe
+
+# Redis hash of source image URL -> thumbnail URL. It is kept across clear-cache (see
+# persistent_cache_keys in hooks.py) and rebuilt from the thumbnail files on disk when
+# it was evicted.
+THUMBNAIL_CACHE_KEY = "promep_item_thumbnails"
+
+THUMBNAIL_SIZE = (256, 256)
+THUMBNAIL_FOLDER = "promep_thumbnails"
+
+def get_thumbnail_folder():
+    """Public site folder holding the generated thumbnails"""
+    return frappe.get_site_path("public", "files", THUMBNAIL_FOLDER)
+
+def get_source_path(image_url):
+    """Local filesystem path of a public item image URL
+
+    Returns None for remote images and for private files, whose thumbnails would
+    otherwise be served publicly, and for paths that resolve outside their folder.
+    """
+
+    if not image_url or image_url.startswith(("http://", "https://")):
+        return None
+
+    path = image_url.split("?", 1)[0]
+    if path.startswith("/files/"):
+        root, relative_path = frappe.get_site_path("public", "files"), path[len("/files/"):]
+    elif path.startswith("/assets/material_requisition/"):
+        root = frappe.get_app_path("material_requisition", "public")
+        relative_path = path[len("/assets/material_requisition/"):]
+    else:
+        return None
+
+    # Reject ../ segments and symlinks leading out of the folder
+    root = os.path.realpath(root)
+    source_path = os.path.realpath(os.path.join(root, relative_path))
+    if os.path.commonpath([root, source_path]) != root:
+        return None
+
+    return source_path
+
+def get_thumbnail_file_name(source_path, size=THUMBNAIL_SIZE):
+    """Content-hash file name of an image's thumbnail, the same for every process"""
+
+    from PIL import features
+
+    with open(source_path, "rb") as f:
+        content_hash = hashlib.sha1(f.read()).hexdigest()
+
+    # WebP when Pillow was built with it, JPEG otherwise
+    extension = "webp" if features.check("webp") else "jpg"
+    return f"{content_hash}-{size[0]}x{size[1]}.{extension}"
+
+def render_thumbnail(source_path, output_folder, size=THUMBNAIL_SIZE):
+    """Write a fixed-size thumbnail of an image under a content-hash name
+
+    Returns the thumbnail file name. Does not touch the database, so it can run in
+    a separate process.
+    """
+
+    from PIL import Image, ImageOps
+
+    file_name = get_thumbnail_file_name(source_path, size)
+    extension = file_name.rsplit(".", 1)[1]
+    output_path = os.path.join(output_folder, file_name)
+    if os.path.exists(output_path):
+        return file_name
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        thumbnail = ImageOps.fit(image.convert("RGBA" if has_alpha else "RGB"), size)
+
+    # JPEG has no alpha channel, so flatten transparent images onto white
+    if has_alpha and extension == "jpg":
+        background = Image.new("RGB", thumbnail.size, (255, 255, 255))
+        background.paste(thumbnail, mask=thumbnail.getchannel("A"))
+        thumbnail = background
+
+    # Write to a temporary name first so readers never see a partial file
+    os.makedirs(output_folder, exist_ok=True)
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    thumbnail.save(temp_path, "WEBP" if extension == "webp" else "JPEG", quality=80)
+    os.replace(temp_path, output_path)
+
+    return file_name
+
+def get_thumbnail_url(file_name):
+    return f"/files/{THUMBNAIL_FOLDER}/{file_name}"
+
+def get_thumbnail_urls():
+    """Map of image URL -> generated thumbnail URL, read in one cache lookup
+
+    An empty map means the cache was evicted (or nothing was generated yet), so a
+    job is queued to restore it from the thumbnail files on disk.
+    """
+
+    thumbnails = {
+        frappe.safe_decode(image_url): thumbnail_url
+        for image_url, thumbnail_url in (frappe.cache.hgetall(THUMBNAIL_CACHE_KEY) or {}).items()
+    }
+    if not thumbnails:
+        frappe.enqueue(
+            "material_requisition.thumbnails.restore_thumbnail_urls",
+            queue="long",
+            job_id="promep_restore_thumbnail_urls",
+            deduplicate=True
+        )
+    return thumbnails
+
+def restore_thumbnail_urls():
+    """Background job re-recording the thumbnails that already exist on disk
+
+    Nothing is rendered; images without a thumbnail file still need the backfill
+    command. Returns the number of thumbnails recorded.
+    """
+
+    output_folder = get_thumbnail_folder()
+    thumbnails = {}
+    for image_url in get_catalog_image_urls():
+        source_path = get_source_path(image_url)
+        if not source_path or not os.path.exists(source_path):
+            continue
+
+        try:
+            file_name = get_thumbnail_file_name(source_path)
+        except Exception as e:
+            frappe.log_error(f"Restore Thumbnail Error for {image_url}: {str(e)}")
+            continue
+
+        if os.path.exists(os.path.join(output_folder, file_name)):
+            thumbnails[image_url] = get_thumbnail_url(file_name)
+
+    if thumbnails:
+        save_thumbnail_urls(thumbnails)
+    return len(thumbnails)
+
+def save_thumbnail_urls(thumbnails):
+    """Record generated thumbnails and drop the item catalog so it picks them up"""
+
+    from material_requisition.item_catalog import clear_catalog_cache
+
+    for image_url, thumbnail_url in thumbnails.items():
+        frappe.cache.hset(THUMBNAIL_CACHE_KEY, image_url, thumbnail_url)
+
+    clear_catalog_cache()
+
+def generate_thumbnail(image_url):
+    """Background job generating the thumbnail of one item image"""
+
+    source_path = get_source_path(image_url)
+    if not source_path or not os.path.exists(source_path):
+        return
+
+    try:
+        file_name = render_thumbnail(source_path, get_thumbnail_folder())
+        save_thumbnail_urls({image_url: get_thumbnail_url(file_name)})
+
+    except Exception as e:
+        frappe.log_error(f"Generate Thumbnail Error for {image_url}: {str(e)}")
+
+def on_item_update(doc, method=None):
+    """doc_events handler queueing a thumbnail when an item image changes"""
+
+    if doc.image and (method == "after_insert" or doc.has_value_changed("image")):
+        frappe.enqueue(
+            "material_requisition.thumbnails.generate_thumbnail",
+            queue="short",
+            image_url=doc.image,
+            enqueue_after_commit=True
+        )
+
+def get_catalog_image_urls():
+    """Every image URL the visual picker can show: item images plus group defaults"""
+
+    from material_requisition.item_catalog import DEFAULT_IMAGE, DEFAULT_ITEM_IMAGES
+
+    image_urls = frappe.get_all(
+        "Item",
+        filters={"disabled": 0, "image": ["is", "set"]},
+        pluck="image",
+        distinct=True
+    )
+    return list(dict.fromkeys([*image_urls, *DEFAULT_ITEM_IMAGES.values(), DEFAULT_IMAGE]))
+
+def backfill_thumbnails(processes=None):
+    """Generate thumbnails for the whole catalog using a process pool
+
+    Returns the number of thumbnails recorded.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    sources = {}
+    for image_url in get_catalog_image_urls():
+        source_path = get_source_path(image_url)
+        if source_path and os.path.exists(source_path):
+            sources[image_url] = source_path
+
+    output_folder = get_thumbnail_folder()
+    thumbnails = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {
+            image_url: executor.submit(render_thumbnail, source_path, output_folder)
+            for image_url, source_path in sources.items()
+        }
+        for image_url, future in futures.items():
+            try:
+                thumbnails[image_url] = get_thumbnail_url(future.result())
+            except Exception as e:
+                frappe.log_error(f"Generate Thumbnail Error for {image_url}: {str(e)}")
+
+    save_thumbnail_urls(thumbnails)
+    return len(thumbnails)